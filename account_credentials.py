@@ -43,30 +43,43 @@ ACCOUNT_CREDENTIALS = {
     'POWDigital': ('POWDIGITAL_ACCESS_KEY', 'POWDIGITAL_SECRET_KEY', 'POWDIGITAL_USER_ID'),
 }
 
+# Case-insensitive view of the mapping, built once at import
+_ACCOUNT_CREDENTIALS_CI = {name.casefold(): secrets for name, secrets in ACCOUNT_CREDENTIALS.items()}
+_ACCOUNT_NAMES = tuple(ACCOUNT_CREDENTIALS)
+
+# Resolved (api_key, api_secret, user_id) tuples. Filled lazily because the
+# tier scripts decrypt .env.encrypted into os.environ after this module loads;
+# only complete credentials are cached so a missing secret is re-checked.
+_RESOLVED: Dict[str, Tuple[str, str, str]] = {}
+
 def get_account_credentials(account_name: str) -> Tuple[str, str, str]:
     """
     Get API credentials for a specific account
     Returns: (api_key, api_secret, user_id)
     """
-    if account_name not in ACCOUNT_CREDENTIALS:
-        raise ValueError(f"Unknown account: {account_name}")
+    key = account_name.casefold()
+    credentials = _RESOLVED.get(key)
+    if credentials is not None:
+        return credentials
     
-    key_name, secret_name, user_id_name = ACCOUNT_CREDENTIALS[account_name]
+    secret_names = _ACCOUNT_CREDENTIALS_CI.get(key)
+    if secret_names is None:
+        raise ValueError(f"Unknown account: {account_name}")
     
-    api_key = os.getenv(key_name)
-    api_secret = os.getenv(secret_name)
-    user_id = os.getenv(user_id_name)
+    values = tuple(map(os.getenv, secret_names))
     
-    if not all([api_key, api_secret, user_id]):
-        missing = []
-        if not api_key: missing.append(key_name)
-        if not api_secret: missing.append(secret_name)
-        if not user_id: missing.append(user_id_name)
+    if not all(values):
+        missing = [name for name, value in zip(secret_names, values) if not value]
         raise ValueError(f"Missing credentials for {account_name}: {missing}")
     
-    return api_key, api_secret, user_id
+    _RESOLVED[key] = values
+    return values
+
+def clear_credentials_cache():
+    """Forget resolved credentials so the next lookup re-reads the environment"""
+    _RESOLVED.clear()
 
-def get_all_account_names():
-    """Get list of all account names"""
-    return list(ACCOUNT_CREDENTIALS.keys())
+def get_all_account_names() -> Tuple[str, ...]:
+    """Get all account names (shared immutable tuple)"""
+    return _ACCOUNT_NAMES
 
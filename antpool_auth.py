@@ -5,9 +5,12 @@ Handles API key management and HMAC-SHA256 signature generation
 
 import hmac
 import hashlib
+import binascii
+import functools
+import threading
 import time
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import os
 
 logger = logging.getLogger(__name__)
@@ -31,31 +34,53 @@ class AntpoolAuth:
         if not all([self.api_key, self.api_secret, self.user_id]):
             raise ValueError("API key, secret, and user ID are required. Set environment variables or pass as parameters.")
         
+        # Key material never changes for an instance, so encode it once and keep
+        # a keyed HMAC template; copy() skips re-deriving the inner/outer pads
+        self._secret_bytes = self.api_secret.encode('utf-8')
+        self._api_key_bytes = self.api_key.encode('utf-8')
+        self._user_id_bytes = self.user_id.encode('utf-8')
+        self._hmac_template = hmac.new(self._secret_bytes, b'', hashlib.sha256)
+        
+        # Main-account signatures always start with userid + api_key, so that
+        # prefix is absorbed once and each signature only hashes the nonce
+        self._main_hmac = self._hmac_template.copy()
+        self._main_hmac.update(self._user_id_bytes + self._api_key_bytes)
+        
+        # Nonces track wall-clock milliseconds but never repeat or go backwards,
+        # even for concurrent requests within the same millisecond
+        self._last_nonce = 0
+        self._nonce_lock = threading.Lock()
+        
         logger.info(f"Initialized Antpool authentication for user: {self.user_id}")
     
+    def _next_nonce(self) -> int:
+        """Return the current time in milliseconds, bumped past the last nonce issued"""
+        with self._nonce_lock:
+            self._last_nonce = max(int(time.time() * 1000), self._last_nonce + 1)
+            return self._last_nonce
+    
     def generate_signature(self, user_id: str = None, nonce: str = None) -> Dict[str, str]:
         """
         Generate HMAC-SHA256 signature for API authentication
         
         Args:
             user_id: User ID (defaults to main user_id)
-            nonce: Nonce value (defaults to current timestamp)
+            nonce: Nonce value (defaults to the next monotonic nonce)
             
         Returns:
             Dictionary containing authentication parameters
         """
         user_id = user_id or self.user_id
-        nonce = nonce or str(int(time.time() * 1000))
-        
-        # Create message: userid + api_key + nonce
-        message = user_id + self.api_key + nonce
+        nonce = nonce or str(self._next_nonce())
         
-        # Generate HMAC-SHA256 signature
-        signature = hmac.new(
-            self.api_secret.encode('utf-8'),
-            message.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest().upper()
+        # Message is userid + api_key + nonce; the main account's prefix is pre-hashed
+        if user_id == self.user_id:
+            h = self._main_hmac.copy()
+        else:
+            h = self._hmac_template.copy()
+            h.update(user_id.encode('utf-8') + self._api_key_bytes)
+        h.update(nonce.encode('ascii'))
+        signature = binascii.hexlify(h.digest()).upper().decode('ascii')
         
         auth_params = {
             'key': self.api_key,
@@ -63,7 +88,7 @@ class AntpoolAuth:
             'signature': signature
         }
         
-        logger.debug(f"Generated signature for user: {user_id}")
+        logger.debug("Generated signature for user: %s", user_id)
         return auth_params
     
     def get_auth_params(self, user_id: str = None, coin: str = 'BTC', 
@@ -81,19 +106,27 @@ class AntpoolAuth:
         """
         # Always use main account user_id for signature generation
         auth_params = self.generate_signature(self.user_id)
-        auth_params['coin'] = coin
-        
-        # If requesting data for a specific sub-account, add userId parameter
-        if user_id and user_id != self.user_id:
-            auth_params['userId'] = user_id
-            # Some endpoints use clientUserId instead
-            auth_params['clientUserId'] = user_id
+        auth_params.update(self._base_params(self.user_id, user_id, coin))
         
         if additional_params:
             auth_params.update(additional_params)
         
         return auth_params
     
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _base_params(main_user_id: str, user_id: Optional[str], coin: str) -> Tuple[Tuple[str, str], ...]:
+        """Static (non-signature) request parameters for a user/coin pair"""
+        params = [('coin', coin)]
+        
+        # If requesting data for a specific sub-account, add userId parameter
+        if user_id and user_id != main_user_id:
+            params.append(('userId', user_id))
+            # Some endpoints use clientUserId instead
+            params.append(('clientUserId', user_id))
+        
+        return tuple(params)
+    
     def verify_signature(self, user_id: str, nonce: str, signature: str) -> bool:
         """
         Verify a signature (for testing purposes)
@@ -130,16 +163,51 @@ class AntpoolConfig:
         'account_overview_by_email': '/accountOverviewListByEmail.htm'
     }
     
+    # Full endpoint URLs, resolved once
+    FULL_URLS = dict(zip(ENDPOINTS, map(BASE_URL.__add__, ENDPOINTS.values())))
+    
     # Supported coin types
-    SUPPORTED_COINS = ['BTC', 'LTC', 'ETH', 'ZEC']
+    SUPPORTED_COINS = frozenset({'BTC', 'LTC', 'ETH', 'ZEC'})
     
     # Rate limiting
     MAX_REQUESTS_PER_10_MIN = 600
+    RATE_LIMIT_WINDOW_SECONDS = 600                       # the limit is over a rolling window
+    RATE_LIMIT_HIGH_WATER = MAX_REQUESTS_PER_10_MIN - 10  # hold calls at this many per window
     MAX_REQUESTS_PER_MINUTE = 60
+    # Token bucket pacing every request (override with ANTPOOL_TOKEN_BURST/ANTPOOL_TOKEN_RATE);
+    # the rate must stay at or under 1.0/s to fit the 600-per-10-minute budget
+    TOKEN_BUCKET_CAPACITY = int(os.getenv('ANTPOOL_TOKEN_BURST', '20'))       # burst size
+    TOKEN_REFILL_PER_SECOND = float(os.getenv('ANTPOOL_TOKEN_RATE', '1.0'))   # sustained rate
     
     # Request timeouts
     REQUEST_TIMEOUT = 30
     
+    # HTTP connection pooling (keep-alive connections reused across requests)
+    POOL_CONNECTIONS = 32
+    POOL_MAXSIZE = 64
+    
+    # Multiplex every Antpool call over one HTTP/2 connection (needs httpx + h2)
+    HTTP2 = os.getenv('ANTPOOL_HTTP2', '').lower() in ('1', 'true', 'yes')
+    
+    # Sub-accounts fetched in parallel per tier (override with TIER1..TIER4_MAX_WORKERS)
+    TIER1_MAX_WORKERS = int(os.getenv('TIER1_MAX_WORKERS', '16'))
+    TIER2_MAX_WORKERS = int(os.getenv('TIER2_MAX_WORKERS', '10'))
+    TIER3_MAX_WORKERS = int(os.getenv('TIER3_MAX_WORKERS', '8'))
+    TIER4_MAX_WORKERS = int(os.getenv('TIER4_MAX_WORKERS', '8'))
+    
+    # Tier 1 snapshot window: balance/hashrate rows upsert on (account, coin, bucket)
+    TIER1_BUCKET_SECONDS = 600
+    
+    # Tier 2 snapshot window: worker rows upsert on (account, worker, bucket)
+    TIER2_BUCKET_SECONDS = 3600
+    
+    # Concurrent page fetches when paginating worker lists
+    PAGINATION_WORKERS = 8
+    
+    # Rows requested per worker-list page; page count is taken from the
+    # server's totalPage, so a server-side cap on pageSize is still honoured
+    WORKER_PAGE_SIZE = 200
+    
     # Retry configuration
     MAX_RETRIES = 3
     RETRY_DELAY = 1  # seconds
@@ -147,14 +215,15 @@ class AntpoolConfig:
     @classmethod
     def get_endpoint_url(cls, endpoint_name: str) -> str:
         """Get full URL for an endpoint"""
-        if endpoint_name not in cls.ENDPOINTS:
-            raise ValueError(f"Unknown endpoint: {endpoint_name}")
-        return cls.BASE_URL + cls.ENDPOINTS[endpoint_name]
+        try:
+            return cls.FULL_URLS[endpoint_name]
+        except KeyError:
+            raise ValueError(f"Unknown endpoint: {endpoint_name}") from None
     
     @classmethod
     def validate_coin_type(cls, coin: str) -> bool:
         """Validate coin type"""
-        return coin.upper() in cls.SUPPORTED_COINS
+        return coin in cls.SUPPORTED_COINS or coin.upper() in cls.SUPPORTED_COINS
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -177,5 +246,5 @@ if __name__ == "__main__":
     
     # Show available endpoints
     print(f"\nAvailable endpoints: {list(AntpoolConfig.ENDPOINTS.keys())}")
-    print(f"Supported coins: {AntpoolConfig.SUPPORTED_COINS}")
+    print(f"Supported coins: {sorted(AntpoolConfig.SUPPORTED_COINS)}")
 
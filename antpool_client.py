@@ -4,82 +4,239 @@ Implements all Antpool API endpoints with error handling and rate limiting
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import logging
-from typing import Dict, List, Optional, Any, Union
-from datetime import datetime, timezone
-import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+import orjson
 from antpool_auth import AntpoolAuth, AntpoolConfig
 
 logger = logging.getLogger(__name__)
 
+# Coins accepted by /changeMiningCoin.htm
+_COIN_SWITCH_ALLOWED = frozenset({'BTC', 'BCH'})
+
+# Transient statuses retried with backoff, by the session's Retry and the HTTP/2 client alike
+_RETRY_STATUSES = (500, 502, 503, 504)
+
 class AntpoolAPIError(Exception):
     """Custom exception for Antpool API errors"""
     pass
 
-class AntpoolClient:
-    """Main client for Antpool API operations"""
+class AntpoolMultiClient:
+    """
+    Shared HTTP transport for Antpool API calls across many accounts
     
-    def __init__(self, api_key: str = None, api_secret: str = None, 
-                 user_id: str = None, email: str = None):
-        """
-        Initialize Antpool API client
-        
-        Args:
-            api_key: Antpool API key
-            api_secret: Antpool API secret  
-            user_id: Main account user ID
-            email: Account email for sub-account operations
-        """
-        self.auth = AntpoolAuth(api_key, api_secret, user_id)
-        self.email = email
+    Owns a single pooled requests.Session and a single rate-limit budget.
+    Credentials are supplied per call, so every account reuses the same
+    keep-alive connections instead of opening its own pool.
+    """
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self):
+        """Initialize the pooled session and rate limiting state"""
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'AntpoolDataExtractor/1.0',
-            'Content-Type': 'application/x-www-form-urlencoded'
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Connection': 'keep-alive',
+            'Accept-Encoding': 'gzip'
         })
         
-        # Rate limiting tracking
+        # Pooled keep-alive connections with retry/backoff on transient failures
+        retry = Retry(total=AntpoolConfig.MAX_RETRIES,
+                      backoff_factor=AntpoolConfig.RETRY_DELAY,
+                      status_forcelist=_RETRY_STATUSES,
+                      allowed_methods=['POST'],
+                      raise_on_status=False)
+        # pool_block makes concurrent fetches wait for a warm pooled connection
+        # rather than opening extra ones that are discarded after a single use
+        adapter = HTTPAdapter(pool_connections=AntpoolConfig.POOL_CONNECTIONS,
+                              pool_maxsize=AntpoolConfig.POOL_MAXSIZE,
+                              max_retries=retry,
+                              pool_block=True)
+        self.session.mount('https://', adapter)
+        
+        # Optional HTTP/2 client; when set, requests go through it instead of the session.
+        # _http2_client keeps the client for close() even after a fallback clears http2
+        self.http2 = None
+        self._http2_client = None
+        self._http2_checked = False
+        self._transport_errors = (requests.exceptions.RequestException,)
+        if AntpoolConfig.HTTP2:
+            self._create_http2_client()
+        
+        # Signers keyed by credentials; reusing one per key keeps its nonces increasing
+        self._auth_lock = threading.Lock()
+        self._auth_cache: Dict[Tuple[Optional[str], Optional[str], Optional[str]], AntpoolAuth] = {}
+        
+        # Rate limiting tracking (shared by all accounts and concurrent fetches)
+        self._rate_lock = threading.Lock()
         self.last_request_time = 0
-        self.request_count = 0
-        self.request_window_start = time.time()
+        # Send times of requests in the last RATE_LIMIT_WINDOW_SECONDS, oldest first
+        self._request_times = deque()
         
-        logger.info("Antpool API client initialized")
+        # Token bucket for request pacing: bursts up to capacity, refills steadily
+        self._tokens = float(AntpoolConfig.TOKEN_BUCKET_CAPACITY)
+        self._last_refill = time.monotonic()
+        
+        logger.info("Antpool shared HTTP client initialized")
     
-    def _rate_limit_check(self):
-        """Check and enforce rate limiting"""
-        current_time = time.time()
+    def _create_http2_client(self):
+        """
+        Set up an httpx client that multiplexes requests over HTTP/2
+        
+        Pooled like the session, so a server that only speaks HTTP/1.1 is not
+        squeezed through one connection; _post_http2 switches back to the
+        session if it is. Connection failures are retried by the transport
+        and 5xx responses by _post_http2. Leaves the HTTP/1.1 session in use
+        when httpx/h2 are unavailable.
+        """
+        try:
+            import httpx
+            self._http2_client = self.http2 = httpx.Client(
+                http2=True,
+                headers={key: value for key, value in self.session.headers.items() if key != 'Connection'},
+                timeout=AntpoolConfig.REQUEST_TIMEOUT,
+                transport=httpx.HTTPTransport(http2=True, retries=AntpoolConfig.MAX_RETRIES,
+                                              limits=httpx.Limits(
+                                                  max_connections=AntpoolConfig.POOL_MAXSIZE,
+                                                  max_keepalive_connections=AntpoolConfig.POOL_CONNECTIONS))
+            )
+        except ImportError as e:
+            logger.warning(f"HTTP/2 unavailable ({e}), using pooled HTTP/1.1 session")
+            return
+        self._transport_errors += (httpx.HTTPError,)
+    
+    def _post_http2(self, url: str, params: Dict):
+        """
+        POST through the HTTP/2 client, retrying 5xx responses like the session's Retry
         
-        # Reset counter every 10 minutes
-        if current_time - self.request_window_start > 600:  # 10 minutes
-            self.request_count = 0
-            self.request_window_start = current_time
+        The first response shows the negotiated protocol; if the server did
+        not agree to HTTP/2, later requests go through the pooled session.
+        """
+        client = self.http2
+        for attempt in range(AntpoolConfig.MAX_RETRIES + 1):
+            if attempt:
+                # Same exponential backoff as urllib3's Retry(backoff_factor=RETRY_DELAY)
+                time.sleep(AntpoolConfig.RETRY_DELAY * 2 ** (attempt - 1))
+            response = client.post(url, data=params)
+            if response.status_code not in _RETRY_STATUSES:
+                break
         
-        # Check if we're approaching the limit
-        if self.request_count >= AntpoolConfig.MAX_REQUESTS_PER_10_MIN - 10:
-            wait_time = 600 - (current_time - self.request_window_start)
-            if wait_time > 0:
-                logger.warning(f"Rate limit approaching, waiting {wait_time:.1f} seconds")
-                time.sleep(wait_time)
-                self.request_count = 0
-                self.request_window_start = time.time()
+        if not self._http2_checked:
+            self._http2_checked = True
+            if response.http_version != 'HTTP/2':
+                logger.warning(f"Server negotiated {response.http_version}, using pooled HTTP/1.1 session")
+                self.http2 = None
+        return response
+    
+    @classmethod
+    def shared(cls) -> 'AntpoolMultiClient':
+        """Get the process-wide shared instance, creating it on first use"""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+    
+    def auth_for(self, api_key: str = None, api_secret: str = None,
+                 user_id: str = None) -> AntpoolAuth:
+        """
+        Get the signer for a set of credentials
         
-        # Ensure minimum 1 second between requests
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < 1.0:
-            time.sleep(1.0 - time_since_last)
+        Args:
+            api_key: Antpool API key
+            api_secret: Antpool API secret
+            user_id: Main account user ID
+            
+        Returns:
+            Cached AntpoolAuth for these credentials
+        """
+        key = (api_key, api_secret, user_id)
+        auth = self._auth_cache.get(key)
+        if auth is None:
+            with self._auth_lock:
+                auth = self._auth_cache.get(key)
+                if auth is None:
+                    auth = AntpoolAuth(api_key, api_secret, user_id)
+                    self._auth_cache[key] = auth
+        return auth
+    
+    def call(self, credentials: Tuple[str, str, str], endpoint: str, user_id: str = None,
+             coin: str = 'BTC', additional_params: Dict = None) -> Dict:
+        """
+        Sign and send a request on behalf of an account
         
-        self.last_request_time = time.time()
-        self.request_count += 1
+        Args:
+            credentials: (api_key, api_secret, user_id) of the signing account
+            endpoint: API endpoint name
+            user_id: Target user ID for the request (for sub-accounts)
+            coin: Coin type
+            additional_params: Additional parameters to include
+            
+        Returns:
+            API response data
+        """
+        auth = self.auth_for(*credentials)
+        params = auth.get_auth_params(user_id=user_id, coin=coin,
+                                      additional_params=additional_params)
+        return self._make_request(endpoint, params)
+    
+    def _rate_limit_check(self):
+        """Check and enforce rate limiting"""
+        with self._rate_lock:
+            self._rate_limit_check_locked()
+    
+    def _rate_limit_check_locked(self):
+        """Rate limiting bookkeeping; caller must hold self._rate_lock"""
+        current_time = time.monotonic()
+        window = AntpoolConfig.RATE_LIMIT_WINDOW_SECONDS
+        request_times = self._request_times
+        
+        # Sliding window matching the API contract: drop sends older than the window,
+        # and at the high-water mark wait only until the oldest one ages out
+        while request_times and request_times[0] <= current_time - window:
+            request_times.popleft()
+        if len(request_times) >= AntpoolConfig.RATE_LIMIT_HIGH_WATER:
+            wait_time = request_times[0] + window - current_time
+            logger.warning(f"Rate limit approaching, waiting {wait_time:.1f} seconds")
+            time.sleep(wait_time)
+            current_time = time.monotonic()
+            while request_times and request_times[0] <= current_time - window:
+                request_times.popleft()
+        
+        # Take a token, waiting only when the bucket is empty
+        refill_rate = AntpoolConfig.TOKEN_REFILL_PER_SECOND
+        self._tokens = min(float(AntpoolConfig.TOKEN_BUCKET_CAPACITY),
+                           self._tokens + (current_time - self._last_refill) * refill_rate)
+        self._last_refill = current_time
+        if self._tokens < 1.0:
+            time.sleep((1.0 - self._tokens) / refill_rate)
+            self._tokens = 0.0
+            self._last_refill = time.monotonic()
+        else:
+            self._tokens -= 1.0
+        
+        self.last_request_time = time.monotonic()
+        request_times.append(self.last_request_time)
     
-    def _make_request(self, endpoint: str, params: Dict, retries: int = 3) -> Dict:
+    def _make_request(self, endpoint: str, params: Dict) -> Dict:
         """
         Make authenticated API request with error handling
         
+        Transient failures (connection errors, 5xx) are retried with
+        exponential backoff by the session's HTTPAdapter (or _post_http2).
+        
         Args:
             endpoint: API endpoint name
             params: Request parameters
-            retries: Number of retry attempts
             
         Returns:
             API response data
@@ -88,39 +245,102 @@ class AntpoolClient:
         
         url = AntpoolConfig.get_endpoint_url(endpoint)
         
-        for attempt in range(retries + 1):
-            try:
-                start_time = time.time()
+        try:
+            start_time = time.monotonic()
+            if self.http2 is not None:
+                response = self._post_http2(url, params)
+            else:
                 response = self.session.post(
                     url, 
                     data=params, 
                     timeout=AntpoolConfig.REQUEST_TIMEOUT
                 )
-                response_time = int((time.time() - start_time) * 1000)
-                
-                # Log the API call
-                logger.debug(f"API call: {endpoint}, Status: {response.status_code}, Time: {response_time}ms")
-                
-                if response.status_code == 200:
-                    try:
-                        data = response.json()
-                        if data.get('code') == 0:
-                            return data.get('data', {})
-                        else:
-                            error_msg = data.get('message', 'Unknown API error')
-                            raise AntpoolAPIError(f"API error: {error_msg}")
-                    except json.JSONDecodeError:
-                        raise AntpoolAPIError("Invalid JSON response")
-                else:
-                    raise AntpoolAPIError(f"HTTP error: {response.status_code}")
-                    
-            except requests.exceptions.RequestException as e:
-                if attempt < retries:
-                    wait_time = AntpoolConfig.RETRY_DELAY * (2 ** attempt)
-                    logger.warning(f"Request failed (attempt {attempt + 1}), retrying in {wait_time}s: {e}")
-                    time.sleep(wait_time)
-                else:
-                    raise AntpoolAPIError(f"Request failed after {retries + 1} attempts: {e}")
+            response_time = int((time.monotonic() - start_time) * 1000)
+        except self._transport_errors as e:
+            raise AntpoolAPIError(f"Request failed after {AntpoolConfig.MAX_RETRIES + 1} attempts: {e}")
+        
+        # Log the API call
+        logger.debug("API call: %s, Status: %s, Time: %sms", endpoint, response.status_code, response_time)
+        
+        if response.status_code == 200:
+            try:
+                data = orjson.loads(response.content)
+            except orjson.JSONDecodeError:
+                raise AntpoolAPIError("Invalid JSON response")
+            
+            if data.get('code') == 0:
+                return data.get('data', {})
+            else:
+                error_msg = data.get('message', 'Unknown API error')
+                raise AntpoolAPIError(f"API error: {error_msg}")
+        else:
+            raise AntpoolAPIError(f"HTTP error: {response.status_code}")
+    
+    def get_rate_limit_status(self) -> Dict:
+        """
+        Get current rate limiting status
+        
+        Returns:
+            Rate limit information
+        """
+        window = AntpoolConfig.RATE_LIMIT_WINDOW_SECONDS
+        with self._rate_lock:
+            current_time = time.monotonic()
+            request_times = [t for t in self._request_times if t > current_time - window]
+        
+        # The window is rolling: it "started" at the oldest request still inside it
+        window_elapsed = current_time - request_times[0] if request_times else 0.0
+        
+        return {
+            'requests_made': len(request_times),
+            'requests_remaining': max(0, AntpoolConfig.MAX_REQUESTS_PER_10_MIN - len(request_times)),
+            'window_elapsed_seconds': window_elapsed,
+            'window_remaining_seconds': max(0, window - window_elapsed),
+            'last_request_seconds_ago': current_time - self.last_request_time
+        }
+    
+    def close(self):
+        """Close the pooled session; closing the shared instance makes shared() build a fresh one"""
+        with AntpoolMultiClient._shared_lock:
+            if AntpoolMultiClient._shared is self:
+                AntpoolMultiClient._shared = None
+        self.session.close()
+        if self._http2_client is not None:
+            self._http2_client.close()
+
+class AntpoolClient:
+    """Main client for Antpool API operations"""
+    
+    def __init__(self, api_key: str = None, api_secret: str = None, 
+                 user_id: str = None, email: str = None,
+                 transport: Optional['AntpoolMultiClient'] = None):
+        """
+        Initialize Antpool API client
+        
+        The HTTP session and rate-limit budget are shared with every other
+        client through AntpoolMultiClient; only credentials are per instance.
+        
+        Args:
+            api_key: Antpool API key
+            api_secret: Antpool API secret  
+            user_id: Main account user ID
+            email: Account email for sub-account operations
+            transport: Pooled transport to send through (defaults to the shared one)
+        """
+        self.transport = transport or AntpoolMultiClient.shared()
+        self.auth = self.transport.auth_for(api_key, api_secret, user_id)
+        self.email = email
+        
+        logger.debug("Antpool API client initialized")
+    
+    @property
+    def session(self) -> requests.Session:
+        """Shared pooled HTTP session"""
+        return self.transport.session
+    
+    def _make_request(self, endpoint: str, params: Dict) -> Dict:
+        """Send a signed request through the shared transport"""
+        return self.transport._make_request(endpoint, params)
     
     def get_pool_stats(self, coin: str = 'BTC') -> Dict:
         """
@@ -188,36 +408,6 @@ class AntpoolClient:
                                          additional_params=additional_params)
         return self._make_request('workers', params)
     
-    def get_all_workers(self, user_id: str = None, coin: str = 'BTC') -> List[Dict]:
-        """
-        Get all workers by paginating through results
-        
-        Args:
-            user_id: User ID
-            coin: Coin type
-            
-        Returns:
-            List of all workers
-        """
-        all_workers = []
-        page = 1
-        
-        while True:
-            result = self.get_workers(user_id=user_id, coin=coin, page=page, page_size=50)
-            
-            if 'rows' in result and result['rows']:
-                all_workers.extend(result['rows'])
-                
-                # Check if we have more pages
-                if page >= result.get('totalPage', 1):
-                    break
-                page += 1
-            else:
-                break
-        
-        logger.info(f"Retrieved {len(all_workers)} workers for user {user_id or 'main'}")
-        return all_workers
-    
     def get_payment_history(self, coin: str = 'BTC', payment_type: str = 'payout',
                            page: int = 1, page_size: int = 50) -> Dict:
         """
@@ -279,74 +469,122 @@ class AntpoolClient:
                                          additional_params=additional_params)
         return self._make_request('worker_list', params)
     
+    def _fetch_worker_page(self, user_id: str, coin: str, worker_status: int,
+                           page: int) -> Optional[Dict]:
+        """
+        Fetch a single page of the worker list
+        
+        Returns:
+            The page's 'result' dict, or None if the page could not be fetched
+        """
+        try:
+            logger.debug("Fetching page %s for %s", page, user_id)
+            response = self.get_worker_list(user_id, coin, worker_status, page,
+                                            AntpoolConfig.WORKER_PAGE_SIZE)
+            
+            # Check if response has the expected structure
+            if not response or 'result' not in response:
+                logger.warning("No result data in response for %s page %s", user_id, page)
+                return None
+            
+            result = response['result']
+            if 'rows' not in result:
+                logger.warning("No rows in result for %s page %s", user_id, page)
+                return None
+            
+            logger.debug("Page %s: Got %s workers", page, len(result['rows']))
+            return result
+            
+        except Exception as e:
+            logger.error("Error fetching page %s for %s: %s", page, user_id, e)
+            return None
+    
+    def _iter_worker_pages(self, user_id: str, coin: str, worker_status: int) -> Iterator[Dict]:
+        """
+        Yield the 'result' dict of every fetched worker-list page, in page order
+        
+        The first page is fetched on its own to learn the page count; the
+        remaining pages are fetched concurrently. Pages that fail are skipped.
+        """
+        first_page = self._fetch_worker_page(user_id, coin, worker_status, 1)
+        if first_page is None:
+            return
+        yield first_page
+        
+        total_pages = first_page.get('totalPage', 1)
+        if total_pages > 1:
+            max_workers = min(AntpoolConfig.PAGINATION_WORKERS, total_pages - 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pages = executor.map(
+                    lambda page: self._fetch_worker_page(user_id, coin, worker_status, page),
+                    range(2, total_pages + 1)
+                )
+                for result in pages:
+                    if result is not None:
+                        yield result
+    
     def get_all_workers(self, user_id: str, coin: str = 'BTC', worker_status: int = 0) -> Dict:
         """
         Get ALL workers across all pages (handles pagination automatically)
         
+        Failed pages are not retried here; they are reported through
+        'pages_failed' and 'complete' so callers can tell a partial list.
+        
         Args:
             user_id: User ID
             coin: Coin type
             worker_status: 0=All, 1=online, 2=offline, 3=invalid
             
         Returns:
-            Complete worker data with all workers from all pages
+            Worker data with all workers from all fetched pages. 'complete' is
+            False when a page failed ('pages_failed') or fewer workers arrived
+            than totalRecord announced; 'api_calls_made' counts every page
+            requested, failed ones included.
         """
         all_workers = []
-        page = 1
-        total_pages = 1
+        total_pages = 0
         total_records = 0
-        api_calls_made = 0
+        pages_fetched = 0
+        filled = 0
         
-        logger.info(f"Starting to fetch ALL workers for {user_id}...")
+        logger.debug("Starting to fetch ALL workers for %s...", user_id)
         
-        while page <= total_pages:
-            try:
-                logger.debug(f"Fetching page {page} for {user_id}")
-                response = self.get_worker_list(user_id, coin, worker_status, page, 50)
-                api_calls_made += 1
+        for page in self._iter_worker_pages(user_id, coin, worker_status):
+            rows = page.get('rows', [])
+            if not pages_fetched:
+                total_pages = page.get('totalPage', 1)
+                total_records = page.get('totalRecord', 0)
+                logger.debug("Found %s total workers across %s pages for %s", total_records, total_pages, user_id)
                 
-                # Check if response has the expected structure
-                if not response or 'result' not in response:
-                    logger.warning(f"No result data in response for {user_id} page {page}")
-                    break
-                
-                result = response['result']
-                if 'rows' not in result:
-                    logger.warning(f"No rows in result for {user_id} page {page}")
-                    break
-                
-                # Add workers from this page
-                page_workers = result.get('rows', [])
-                all_workers.extend(page_workers)
-                
-                # Update pagination info from first response
-                if page == 1:
-                    total_pages = result.get('totalPage', 1)
-                    total_records = result.get('totalRecord', 0)
-                    logger.info(f"Found {total_records} total workers across {total_pages} pages for {user_id}")
-                
-                logger.debug(f"Page {page}: Got {len(page_workers)} workers")
-                page += 1
-                
-                # Small delay between pages to be respectful to API
-                if page <= total_pages:
-                    time.sleep(0.5)
-                    
-            except Exception as e:
-                logger.error(f"Error fetching page {page} for {user_id}: {e}")
-                break
+                # Size the list once from totalRecord and fill it page by page;
+                # slice assignment still grows it if more rows arrive than expected
+                all_workers = [None] * max(total_records, len(rows))
+            
+            all_workers[filled:filled + len(rows)] = rows
+            filled += len(rows)
+            pages_fetched += 1
+        
+        # Drop unused slots (failed pages or shrinking worker count)
+        del all_workers[filled:]
+        
+        # Page 1 is always requested; the rest only once it reports the page count
+        pages_requested = max(total_pages, 1)
+        pages_failed = pages_requested - pages_fetched
         
         result = {
             'workers': all_workers,
             'total_workers': len(all_workers),
-            'total_pages_fetched': page - 1,
+            'total_pages_fetched': pages_fetched,
             'total_records_expected': total_records,
-            'api_calls_made': api_calls_made,
+            'pages_failed': pages_failed,
+            'complete': pages_failed == 0 and filled >= total_records,
+            'api_calls_made': pages_requested,
             'user_id': user_id,
             'coin': coin
         }
         
-        logger.info(f"✅ Completed fetching workers for {user_id}: {len(all_workers)}/{total_records} workers from {page-1}/{total_pages} pages")
+        logger.debug("Completed fetching workers for %s: %s/%s workers from %s/%s pages",
+                     user_id, len(all_workers), total_records, pages_fetched, total_pages)
         return result
     
     def get_hashrate_chart(self, user_id: str = None, worker_id: str = None,
@@ -458,7 +696,7 @@ class AntpoolClient:
         Returns:
             Operation result
         """
-        if coin not in ['BTC', 'BCH']:
+        if coin not in _COIN_SWITCH_ALLOWED:
             raise ValueError("Only BTC and BCH are supported for coin switching")
             
         params = self.auth.get_auth_params(coin=coin)
@@ -491,21 +729,12 @@ class AntpoolClient:
     
     def get_rate_limit_status(self) -> Dict:
         """
-        Get current rate limiting status
+        Get current rate limiting status (shared across all clients)
         
         Returns:
             Rate limit information
         """
-        current_time = time.time()
-        window_elapsed = current_time - self.request_window_start
-        
-        return {
-            'requests_made': self.request_count,
-            'requests_remaining': max(0, AntpoolConfig.MAX_REQUESTS_PER_10_MIN - self.request_count),
-            'window_elapsed_seconds': window_elapsed,
-            'window_remaining_seconds': max(0, 600 - window_elapsed),
-            'last_request_seconds_ago': current_time - self.last_request_time
-        }
+        return self.transport.get_rate_limit_status()
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Collection Daemon - all four tiers in one long-running process
+Alternative to running collect_tier1-4.py as separate cron jobs
+- Environment is decrypted once at startup
+- One orchestrator (and pooled Antpool session) is shared by every tier
+- Tiers run on the same schedules as the cron jobs; tiers that fire together
+  (Tier 1 with Tier 3 or Tier 4 on the hour) run side by side
+"""
+
+import os
+import sys
+import signal
+import logging
+import threading
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Load encrypted environment variables FIRST
+from env_manager import EncryptedEnvManager
+
+try:
+    env_manager = EncryptedEnvManager()
+    env_vars = env_manager.load_encrypted_env('.env.encrypted')
+    logging.info(f"Successfully loaded {len(env_vars)} environment variables from encrypted file")
+except Exception as e:
+    logging.error(f"Failed to load encrypted environment: {e}")
+    logging.warning("Falling back to regular environment variables")
+
+from data_orchestrator import DataExtractionOrchestrator
+from account_credentials import clear_credentials_cache
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# Reduce noise from HTTP, Supabase and scheduler internals
+logging.getLogger('httpx').setLevel(logging.WARNING)
+logging.getLogger('supabase').setLevel(logging.WARNING)
+logging.getLogger('apscheduler').setLevel(logging.WARNING)
+
+logger = logging.getLogger(__name__)
+
+# Same schedules as the tier workflows
+TIER_SCHEDULES = {
+    'tier1': {'minute': '*/10'},
+    'tier2': {'minute': '15'},
+    'tier3': {'hour': '2', 'minute': '0'},
+    'tier4': {'hour': '3', 'minute': '0'},
+}
+
+# Tiers currently running; overlapping tiers share one API budget
+_active_tiers = 0
+_active_lock = threading.Lock()
+
+def run_tier(orchestrator: DataExtractionOrchestrator, tier: str, coin: str = 'BTC'):
+    """Run one tier on the shared orchestrator and log its outcome"""
+    global _active_tiers
+    with _active_lock:
+        # A run gets a fresh API budget, as a fresh cron process would, unless
+        # it joins tiers already running (the transport limiter is global anyway)
+        if _active_tiers == 0:
+            orchestrator.api_calls_made = 0
+        _active_tiers += 1
+
+    try:
+        results = getattr(orchestrator, f'collect_{tier}_data')(coin=coin)
+        status = '✓' if results['success'] else '✗'
+        logger.info(f"{status} {tier}: {results['api_calls_made']} API calls, {len(results['errors'])} errors")
+    except Exception as e:
+        logger.error(f"✗ {tier} failed with exception: {e}")
+    finally:
+        try:
+            orchestrator.flush()
+        except Exception as e:
+            logger.error(f"✗ {tier} final flush failed: {e}")
+        finally:
+            with _active_lock:
+                _active_tiers -= 1
+
+def reload_credentials(orchestrator: DataExtractionOrchestrator):
+    """Re-read .env.encrypted and drop cached credentials (SIGHUP handler)"""
+    try:
+        env_manager.load_encrypted_env('.env.encrypted')
+    except Exception as e:
+        logger.error(f"Failed to reload encrypted environment: {e}")
+    clear_credentials_cache()
+    orchestrator.clear_client_cache()
+    logger.info("Credentials reloaded")
+
+def main():
+    """Start the scheduler and block until interrupted"""
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_KEY')
+
+    if not supabase_url or not supabase_key:
+        logger.error("Missing Supabase credentials")
+        sys.exit(1)
+
+    orchestrator = DataExtractionOrchestrator(supabase_url, supabase_key)
+
+    # One thread per tier lets coinciding tiers overlap on the shared orchestrator;
+    # max_instances keeps a slow run of a tier from overlapping its own next run;
+    # cron fields are UTC, matching the UTC timestamps on every stored row
+    scheduler = BlockingScheduler(executors={'default': ThreadPoolExecutor(len(TIER_SCHEDULES))},
+                                  job_defaults={'coalesce': True, 'max_instances': 1,
+                                                'misfire_grace_time': 300},
+                                  timezone='UTC')
+
+    for tier, schedule in TIER_SCHEDULES.items():
+        scheduler.add_job(run_tier, 'cron', args=[orchestrator, tier], id=tier, **schedule)
+
+    # Credentials are cached for the life of the process; SIGHUP picks up rotations
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload_credentials(orchestrator))
+
+    logger.info("Collection daemon started")
+    with orchestrator:
+        try:
+            scheduler.start()
+        except (KeyboardInterrupt, SystemExit):
+            logger.info("Collection daemon stopping")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Collects essential dashboard data from all sub-accounts using individual credent
 
 import os
 import sys
+import asyncio
 import logging
 from datetime import datetime, timezone
 
@@ -33,8 +34,19 @@ logging.basicConfig(
     format='%(levelname)s:%(name)s:%(message)s'
 )
 
+# Reduce noise from HTTP and Supabase clients
+logging.getLogger('httpx').setLevel(logging.WARNING)
+logging.getLogger('supabase').setLevel(logging.WARNING)
+
 logger = logging.getLogger(__name__)
 
+async def _run_all(orchestrator: DataExtractionOrchestrator, coins):
+    """Collect Tier 1 data for all coins concurrently"""
+    return await asyncio.gather(
+        *(orchestrator.collect_tier1_data_async(coin) for coin in coins),
+        return_exceptions=True
+    )
+
 def main():
     """Main execution function"""
     try:
@@ -51,17 +63,21 @@ def main():
         orchestrator = DataExtractionOrchestrator(supabase_url, supabase_key)
         
         # Process coins
-        coins = ['BTC']  # Add more coins as needed
+        # Coins are collected concurrently, so extra coins add little wall time
+        coins = [coin.strip() for coin in os.getenv('ANTPOOL_COINS', 'BTC').split(',') if coin.strip()]
         total_datasets = 0
         total_offline_devices = 0
         total_sub_accounts = 0
         total_api_calls = 0
         
-        for coin in coins:
-            logger.info(f"Processing Tier 1 data for {coin}...")
-            
+        logger.info(f"Processing Tier 1 data for {', '.join(coins)}...")
+        with orchestrator:
+            results_list = asyncio.run(_run_all(orchestrator, coins))
+        
+        for coin, results in zip(coins, results_list):
             try:
-                results = orchestrator.collect_tier1_data(coin)
+                if isinstance(results, Exception):
+                    raise results
                 
                 if results['success']:
                     datasets = len(results['data_collected'])
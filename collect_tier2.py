@@ -11,7 +11,7 @@ Collects complete worker data for all 33 pools every 30 minutes
 import os
 import sys
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -39,6 +39,7 @@ logger = logging.getLogger(__name__)
 def main():
     """Main execution function for optimized Tier 2 data collection"""
     try:
+        run_started = datetime.now(timezone.utc)
         logger.info("Starting Tier 2 - Account Overview Data Collection (OPTIMIZED)")
         
         # Get Supabase credentials
@@ -51,8 +52,9 @@ def main():
         # Initialize optimized orchestrator
         orchestrator = DataExtractionOrchestrator(supabase_url, supabase_key)
         
-        # Collect Tier 2 data with optimizations
-        results = orchestrator.collect_tier2_data(coin='BTC')
+        with orchestrator:
+            # Collect Tier 2 data with optimizations
+            results = orchestrator.collect_tier2_data(coin='BTC', as_of=run_started)
         
         # Report clean summary results
         if results['success']:
@@ -60,9 +62,9 @@ def main():
             logger.info(f"📊 SUMMARY:")
             logger.info(f"   • Accounts processed: {results['sub_accounts_processed']}")
             logger.info(f"   • Total workers found: {results['total_workers_found']}")
-            logger.info(f"   • Workers stored: {results['workers_stored']}")
+            logger.info(f"   • Workers processed: {results['workers_processed']}")
+            logger.info(f"   • Workers stored: {results['total_workers_stored']}")
             logger.info(f"   • API calls made: {results['api_calls_made']}")
-            logger.info(f"   • Data collected: {len(results['data_collected'])} datasets")
             
             if results['errors']:
                 logger.warning(f"⚠️  PARTIAL SUCCESS: {len(results['errors'])} accounts had errors")
@@ -26,6 +26,11 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+
+# Reduce noise from HTTP and Supabase clients
+logging.getLogger('httpx').setLevel(logging.WARNING)
+logging.getLogger('supabase').setLevel(logging.WARNING)
+
 logger = logging.getLogger(__name__)
 
 def main():
@@ -43,8 +48,9 @@ def main():
         # Initialize orchestrator
         orchestrator = DataExtractionOrchestrator(supabase_url, supabase_key)
         
-        # Collect Tier 4 data
-        results = orchestrator.collect_tier4_data(coin='BTC')
+        with orchestrator:
+            # Collect Tier 4 data
+            results = orchestrator.collect_tier4_data(coin='BTC')
         
         # Report results
         if results['success']:
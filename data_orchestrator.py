@@ -4,51 +4,249 @@ Implements all 4 tiers with API rate limiting (600 calls per 10 minutes)
 Aligned with actual Antpool API capabilities
 """
 
+import asyncio
+import functools
 import logging
+import operator
+import threading
 import time
-from typing import Dict, Any, List, Optional
-from datetime import datetime, timezone
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 
-from antpool_client import AntpoolClient
-from supabase_manager import SupabaseManager
+from antpool_auth import AntpoolConfig
+from antpool_client import AntpoolClient, AntpoolMultiClient
+from supabase_manager import BulkWriteError, SupabaseAuthError, SupabaseManager
 from account_credentials import get_account_credentials, get_all_account_names
 
 logger = logging.getLogger(__name__)
 
+# Hashrate unit suffixes and their multiplier to H/s ('' = bare number, already H/s)
+_HASHRATE_UNITS = {
+    'TH/s': 1_000_000_000_000,
+    'GH/s': 1_000_000_000,
+    'MH/s': 1_000_000,
+    'H/s': 1,
+    '': 1
+}
+
+# Zero-hashrate spellings (offline workers dominate some lists), answered without parsing
+_ZERO_HASHRATES = frozenset({'0 TH/s', '0.00 TH/s', '0', ''})
+
+# Reject ratios that dominate worker lists, answered without a float() parse
+_COMMON_PERCENTAGES = {'0%': 0.0, '0.0%': 0.0, '0.00%': 0.0, '0': 0.0}
+
+# Worker share times are epoch milliseconds; offsets from this avoid fromtimestamp
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Worker-list fields read per worker, with the default used when a record lacks one
+_WORKER_FIELDS = (
+    ('workerId', 'unknown'),
+    ('hsLast10min', '0'),
+    ('hsLast1h', '0'),
+    ('hsLast1d', '0'),
+    ('shareLastTime', None),
+    ('rejectRatio', '0%')
+)
+_extract_worker_fields = operator.itemgetter(*(field for field, _ in _WORKER_FIELDS))
+
+# End-of-run summary fields and the human-readable line each is logged as
+_SUMMARY_LINES = {
+    'accounts_processed': 'Processed: %s accounts',
+    'workers_analyzed': 'Workers analyzed: %s',
+    'payments_collected': 'Payments collected: %s',
+    'api_calls': 'API calls: %s',
+    'workers_found': 'Workers found: %s',
+    'workers_stored': 'Workers stored: %s',
+    'datasets': 'Data collected: %s datasets',
+    'offline_devices': 'Offline devices: %s',
+    'execution_time': 'Execution time: %.2fs'
+}
+
 class DataExtractionOrchestrator:
+    # Account name -> id entries kept before the least recently used is evicted
+    ACCOUNT_CACHE_SIZE = 256
+    
+    # Seconds a Tier 3 problem-account list is reused (Tier 1 refreshes the data every 10 min)
+    PROBLEM_ACCOUNTS_TTL = 300
+    
     def __init__(self, supabase_url: str, supabase_key: str):
         """Initialize the orchestrator with Supabase connection"""
         self.db = SupabaseManager(supabase_url, supabase_key)
-        self.account_cache = {}  # Cache for account IDs
+        self.http = AntpoolMultiClient()  # Pooled Antpool session shared by every tier; closed in __exit__
+        self.account_cache: 'OrderedDict[str, int]' = OrderedDict()  # LRU cache for account IDs
+        self._account_lock = threading.Lock()
+        self._clients: Dict[str, Tuple[AntpoolClient, str]] = {}  # Account name -> (client, user_id)
+        # Secondary per-account API calls that overlap the account's main call
+        self._call_pool = ThreadPoolExecutor(max_workers=AntpoolConfig.TIER1_MAX_WORKERS,
+                                             thread_name_prefix='antpool-call')
         self.api_calls_made = 0
+        self._calls_lock = threading.Lock()  # api_calls_made is bumped from many worker threads
         self.api_call_limit = 580  # Leave buffer under 600 limit
+        self._buf: Dict[str, List[Dict[str, Any]]] = defaultdict(list)  # Rows pending bulk insert, by table
+        self._buf_lock = threading.Lock()
+        # Full chunks are written here so the fetching thread moves on to its next API call
+        self._db_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-write')
+        self._pending_writes: List[Future] = []
+        self._problem_cache: Optional[Tuple[float, List[str]]] = None  # (monotonic time, accounts)
         logger.info("Data Extraction Orchestrator initialized")
     
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Flush buffered rows and release database and pooled HTTP connections"""
+        try:
+            self.flush()
+        finally:
+            self._call_pool.shutdown(wait=False)
+            self._db_pool.shutdown(wait=True)
+            self.db.close()
+            self.http.close()
+        return False
+    
     def _get_or_create_account(self, account_name: str, account_type: str = 'sub') -> int:
         """Get or create account in database and return account_id"""
-        if account_name in self.account_cache:
-            return self.account_cache[account_name]
+        with self._account_lock:
+            account_id = self.account_cache.get(account_name)
+            if account_id is not None:
+                self.account_cache.move_to_end(account_name)
+                return account_id
         
         # Try to get existing account
         account_id = self.db.get_account_id(account_name)
         if account_id:
-            logger.debug(f"Found existing account: {account_name}")
+            logger.debug("Found existing account: %s", account_name)
         else:
             # Create new account
             account_id = self.db.upsert_account(account_name, account_type)
-            logger.info(f"Created new account: {account_name}")
+            logger.info("Created new account: %s", account_name)
         
-        self.account_cache[account_name] = account_id
+        with self._account_lock:
+            self.account_cache[account_name] = account_id
+            self.account_cache.move_to_end(account_name)
+            if len(self.account_cache) > self.ACCOUNT_CACHE_SIZE:
+                self.account_cache.popitem(last=False)
         return account_id
     
-    def _log_api_call(self, endpoint: str, account_id: Optional[int] = None, 
-                     status: int = 200, response_time: int = 0, error: str = None):
-        """Log API call for rate limiting"""
+    def _client_for(self, account_name: str) -> Tuple[AntpoolClient, str]:
+        """Return the account's cached API client together with its user id"""
+        cached = self._clients.get(account_name)
+        if cached is None:
+            api_key, api_secret, user_id = get_account_credentials(account_name)
+            client = AntpoolClient(api_key=api_key, api_secret=api_secret, user_id=user_id,
+                                   transport=self.http)
+            cached = self._clients[account_name] = (client, user_id)
+        return cached
+    
+    def clear_client_cache(self):
+        """Drop cached per-account clients so rotated credentials take effect"""
+        self._clients.clear()
+    
+    def _prefetch_accounts(self, account_names, account_type: str = 'sub'):
+        """Resolve every uncached account id up front in one SELECT plus one bulk UPSERT"""
+        with self._account_lock:
+            missing = [name for name in account_names if name not in self.account_cache]
+        if not missing:
+            return
+        
         try:
-            self.db.log_api_call(endpoint, account_id, status, response_time, error)
-            self.api_calls_made += 1
+            account_ids = self.db.get_account_ids(missing)
+            new_accounts = [name for name in missing if name not in account_ids]
+            if new_accounts:
+                account_ids.update(self.db.upsert_accounts(new_accounts, account_type))
+                logger.info(f"Created {len(new_accounts)} new accounts")
+        except SupabaseAuthError:
+            # Bad credentials fail every account the same way; abort the tier now
+            raise
         except Exception as e:
-            logger.warning(f"Failed to log API call: {e}")
+            if self.db.is_auth_error(e):
+                raise SupabaseAuthError(f"Supabase rejected credentials: {e}") from e
+            # Per-account lookups in _get_or_create_account still cover any gaps
+            logger.warning(f"Failed to prefetch account ids: {e}")
+            return
+        
+        with self._account_lock:
+            self.account_cache.update(account_ids)
+            while len(self.account_cache) > self.ACCOUNT_CACHE_SIZE:
+                self.account_cache.popitem(last=False)
+    
+    def _log_api_call(self, endpoint: str, account_id: Optional[int] = None, 
+                     status: int = 200, response_time: int = 0, error: str = None, calls: int = 1):
+        """Count API calls and buffer one api_call_logs row for them (calls > 1 for paginated fetches)"""
+        with self._calls_lock:
+            self.api_calls_made += calls
+        row = self.db.api_call_log_row(endpoint, account_id, status, response_time, error, calls)
+        row['created_at'] = datetime.now(timezone.utc).isoformat()  # call time, not flush time
+        self._buffer_row('api_call_logs', row)
+    
+    def _buffer_row(self, table: str, row: Dict[str, Any]):
+        """Queue a row for bulk insert, flushing the table once a full chunk is pending"""
+        with self._buf_lock:
+            pending = self._buf[table]
+            pending.append(row)
+            if len(pending) < self.db.BULK_CHUNK_SIZE:
+                return
+            self._buf[table] = []
+            self._pending_writes.append(self._db_pool.submit(self._flush_buffer, table, pending))
+    
+    def _flush_buffer(self, table: str, rows: List[Dict[str, Any]]) -> int:
+        """Write buffered rows for one table in bulk, upserting tables with a conflict key"""
+        on_conflict = self.db.UPSERT_CONFLICT_KEYS.get(table)
+        if on_conflict:
+            return self.db.bulk_upsert(table, rows, on_conflict)
+        return self.db.bulk_insert(table, rows)
+    
+    def flush(self) -> int:
+        """
+        Write out every buffered row and wait for in-flight chunk writes; returns rows written
+        
+        Every table is attempted and every in-flight write drained even if one
+        fails; the first SupabaseAuthError is re-raised once all have finished.
+        """
+        with self._buf_lock:
+            buffered, self._buf = self._buf, defaultdict(list)
+            pending, self._pending_writes = self._pending_writes, []
+        
+        written = 0
+        auth_error: Optional[SupabaseAuthError] = None
+        for table, rows in buffered.items():
+            if not rows:
+                continue
+            try:
+                written += self._flush_buffer(table, rows)
+            except BulkWriteError as e:
+                written += e.written
+                logger.error(f"Bulk insert into {table} failed: {e}")
+            except SupabaseAuthError as e:
+                logger.error(f"Bulk insert into {table} failed: {e}")
+                auth_error = auth_error or e
+            except Exception as e:
+                logger.error(f"Bulk insert into {table} failed: {e}")
+        
+        wait(pending)
+        for future in pending:
+            try:
+                written += future.result()
+            except BulkWriteError as e:
+                written += e.written
+                logger.error(f"Background bulk insert failed: {e}")
+            except SupabaseAuthError as e:
+                logger.error(f"Background bulk insert failed: {e}")
+                auth_error = auth_error or e
+            except Exception as e:
+                logger.error(f"Background bulk insert failed: {e}")
+        
+        if auth_error is not None:
+            raise auth_error
+        return written
+    
+    def _log_tier_summary(self, tier: str, **summary):
+        """Log a tier's summary; the fields also ride on the header record as extra attributes"""
+        logger.info("=== %s Collection Complete ===", tier, extra={'tier': tier, 'summary': summary})
+        for field, value in summary.items():
+            logger.info(_SUMMARY_LINES[field], value)
     
     def _check_rate_limit(self) -> bool:
         """Check if we're approaching API rate limit"""
@@ -57,38 +255,42 @@ class DataExtractionOrchestrator:
             return False
         return True
     
-    def _parse_hashrate(self, hashrate_str: str) -> int:
+    # Worker lists repeat the same strings ('0 TH/s', '0.00%', ...) heavily, so
+    # the pure string parsers are memoized; timestamps are near-unique and are not
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _parse_hashrate(hashrate_str: str) -> int:
         """Parse hashrate string like '116.34 TH/s' to integer value in H/s"""
-        if not hashrate_str or hashrate_str == '0':
+        if not hashrate_str or hashrate_str in _ZERO_HASHRATES:
             return 0
         
         try:
-            # Remove units and convert to float
-            value_str = hashrate_str.replace(' TH/s', '').replace(' GH/s', '').replace(' MH/s', '').replace(' H/s', '')
-            value = float(value_str)
-            
-            # Convert to H/s based on unit
-            if 'TH/s' in hashrate_str:
-                return int(value * 1_000_000_000_000)  # TH to H
-            elif 'GH/s' in hashrate_str:
-                return int(value * 1_000_000_000)      # GH to H
-            elif 'MH/s' in hashrate_str:
-                return int(value * 1_000_000)          # MH to H
-            else:
-                return int(value)                       # Already in H/s
-        except (ValueError, AttributeError):
-            logger.warning(f"Could not parse hashrate: {hashrate_str}")
+            # Nearly every worker reports TH/s: strip the known suffix directly
+            if hashrate_str.endswith(' TH/s'):
+                return int(float(hashrate_str[:-5]) * _HASHRATE_UNITS['TH/s'])
+            
+            # Split '116.34 GH/s' into value and unit, then scale to H/s
+            value_str, _, unit = hashrate_str.partition(' ')
+            return int(float(value_str) * _HASHRATE_UNITS[unit])
+        except (ValueError, AttributeError, KeyError):
+            logger.warning("Could not parse hashrate: %s", hashrate_str)
             return 0
     
-    def _parse_percentage(self, percentage_str: str) -> float:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _parse_percentage(percentage_str: str) -> float:
         """Parse percentage string like '0.03%' to float value"""
         if not percentage_str:
             return 0.0
         
+        common = _COMMON_PERCENTAGES.get(percentage_str)
+        if common is not None:
+            return common
+        
         try:
-            return float(percentage_str.replace('%', ''))
-        except (ValueError, AttributeError):
-            logger.warning(f"Could not parse percentage: {percentage_str}")
+            return float(percentage_str.removesuffix('%'))
+        except (ValueError, AttributeError, TypeError):
+            logger.warning("Could not parse percentage: %s", percentage_str)
             return 0.0
     
     def _parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
@@ -97,73 +299,170 @@ class DataExtractionOrchestrator:
             return None
         
         try:
-            # Convert milliseconds to seconds
-            timestamp_seconds = int(timestamp_str) / 1000
-            return datetime.fromtimestamp(timestamp_seconds, tz=timezone.utc)
-        except (ValueError, TypeError):
-            logger.warning(f"Could not parse timestamp: {timestamp_str}")
+            return _EPOCH + timedelta(milliseconds=int(timestamp_str))
+        except (ValueError, TypeError, OverflowError):
+            logger.warning("Could not parse timestamp: %s", timestamp_str)
             return None
     
-    def _parse_and_store_workers(self, account_id: int, account_name: str, workers_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Parse worker data and store individual worker records"""
-        workers = workers_data.get('workers', [])
-        total_workers = len(workers)
-        active_workers = 0
-        inactive_workers = 0
-        workers_stored = 0
-        
-        logger.info(f"Parsing {total_workers} workers for {account_name}...")
+    def _iter_worker_rows(self, account_id: int, account_name: str, workers: List[Dict[str, Any]],
+                          created_at: str, bucket: int) -> Iterator[Dict[str, Any]]:
+        """Yield parsed worker rows in workers-table format, skipping unparseable workers"""
+        parse_hashrate = self._parse_hashrate
+        parse_percentage = self._parse_percentage
+        parse_timestamp = self._parse_timestamp
         
         for worker in workers:
             try:
-                # Parse worker data
-                hashrate_10m = self._parse_hashrate(worker.get('hsLast10min', '0'))
-                hashrate_1h = self._parse_hashrate(worker.get('hsLast1h', '0'))
-                hashrate_1d = self._parse_hashrate(worker.get('hsLast1d', '0'))
-                reject_rate = self._parse_percentage(worker.get('rejectRatio', '0%'))
-                last_share_time = self._parse_timestamp(worker.get('shareLastTime'))
-                
-                # Determine worker status
-                worker_status = 'active' if hashrate_10m > 0 else 'inactive'
-                if worker_status == 'active':
-                    active_workers += 1
-                else:
-                    inactive_workers += 1
+                try:
+                    worker_id, hs_10m, hs_1h, hs_1d, share_last_time, reject_ratio = _extract_worker_fields(worker)
+                except KeyError:
+                    # Sparse record: fall back to per-field defaults
+                    worker_id, hs_10m, hs_1h, hs_1d, share_last_time, reject_ratio = (
+                        worker.get(field, default) for field, default in _WORKER_FIELDS
+                    )
                 
-                # Prepare worker data for database
-                worker_data = {
+                yield {
                     'account_id': account_id,
-                    'worker_name': worker.get('workerId', 'unknown'),
-                    'worker_status': worker_status,
-                    'hashrate_1h': hashrate_1h,
-                    'hashrate_24h': hashrate_1d,  # Map 1d to 24h field
-                    'last_share_time': last_share_time,
-                    'reject_rate': reject_rate,
-                    'data_type': 'tier2_complete'
+                    'worker_name': worker_id,
+                    'worker_status': 'online' if parse_hashrate(hs_10m) > 0 else 'offline',
+                    'hashrate_1h': parse_hashrate(hs_1h),
+                    'hashrate_24h': parse_hashrate(hs_1d),  # Map 1d to 24h field
+                    'last_share_time': parse_timestamp(share_last_time),  # datetime; encoded at write time
+                    'reject_rate': parse_percentage(reject_ratio),
+                    'created_at': created_at,
+                    'timestamp_bucket': bucket
                 }
                 
-                # Store worker in database
-                self.db.insert_worker_data(account_id, 'BTC', worker_data, 'tier2_complete')
-                workers_stored += 1
-                
             except Exception as e:
-                logger.error(f"Failed to parse worker {worker.get('workerId', 'unknown')} for {account_name}: {e}")
+                logger.error("Failed to parse worker %s for %s: %s", worker.get('workerId', 'unknown'), account_name, e)
                 continue
+    
+    def _parse_and_store_workers(self, account_id: int, account_name: str, workers_data: Dict[str, Any],
+                                 as_of: datetime) -> Dict[str, Any]:
+        """Parse worker data and store individual worker records stamped with the run's as_of time"""
+        workers = workers_data.get('workers', [])
+        total_workers = len(workers)
+        workers_processed = 0
+        active_workers = 0
+        
+        logger.debug("Parsing %s workers for %s...", total_workers, account_name)
+        
+        # Rows are parsed lazily and queued for bulk insert as they are
+        # produced; the buffer writes them out in BULK_CHUNK_SIZE chunks.
+        # Only online rows are tallied; the other counts follow once at the end
+        created_at = as_of.isoformat()
+        buffer_row = self._buffer_row
+        # Re-runs inside one snapshot window update the window's rows instead of adding more
+        bucket = int(as_of.timestamp() // AntpoolConfig.TIER2_BUCKET_SECONDS)
+        for worker_row in self._iter_worker_rows(account_id, account_name, workers, created_at, bucket):
+            workers_processed += 1
+            active_workers += worker_row['worker_status'] == 'online'
+            buffer_row('workers', worker_row)
+        
+        inactive_workers = workers_processed - active_workers
+        workers_stored = workers_processed
         
         # Calculate summary statistics
         summary = {
             'total_workers': total_workers,
+            'workers_processed': workers_processed,
             'active_workers': active_workers,
             'inactive_workers': inactive_workers,
             'invalid_workers': 0,  # Could calculate based on high reject rates
             'workers_stored': workers_stored,
             'api_calls_made': workers_data.get('api_calls_made', 0),
-            'pages_fetched': (total_workers + 49) // 50  # Calculate pages based on worker count (50 per page)
+            'pages_fetched': workers_data.get('total_pages_fetched', 0)
         }
         
-        logger.info(f"✅ Parsed workers for {account_name}: {active_workers} active, {inactive_workers} inactive, {workers_stored} stored")
+        logger.debug("Parsed workers for %s: %s active, %s inactive, %s stored",
+                     account_name, active_workers, inactive_workers, workers_stored)
         return summary
     
+    def _call_endpoint(self, account_id: int, endpoint: str, call, *args,
+                       **kwargs) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Time an Antpool call and buffer its api_call_logs entry
+        
+        Returns (payload, None) on success, otherwise (None, error message). The
+        client strips the API envelope and raises on a non-zero code, so a
+        normal return is a success and exceptions are reported, not raised.
+        """
+        call_start = time.perf_counter_ns()
+        try:
+            response = call(*args, **kwargs)
+        except Exception as e:
+            call_time = (time.perf_counter_ns() - call_start) // 1_000_000
+            self._log_api_call(endpoint, account_id, 500, call_time, str(e))
+            return None, str(e)
+        call_time = (time.perf_counter_ns() - call_start) // 1_000_000
+        
+        self._log_api_call(endpoint, account_id, 200, call_time)
+        return response, None
+    
+    def _collect_tier1_account(self, account_name: str, coin: str, bucket: int) -> Dict[str, Any]:
+        """Collect balance and hashrate for one account; returns its partial results"""
+        partial = {
+            'data_collected': [],
+            'errors': [],
+            'api_calls_made': 0,
+            'offline_devices': [],
+            'sub_accounts_processed': 0
+        }
+        
+        # Client bound to this account's credentials (reused across runs)
+        client, user_id = self._client_for(account_name)
+        
+        # Create/get account in database
+        account_id = self._get_or_create_account(account_name, 'sub')
+        
+        # The two calls are independent: start the hashrate fetch on the
+        # call pool so it overlaps the balance fetch on this thread
+        hashrate_future = None
+        if self._check_rate_limit():
+            logger.debug("Collecting hashrate for %s...", account_name)
+            hashrate_future = self._call_pool.submit(self._call_endpoint, account_id, '/api/hashrate.htm',
+                                                     client.get_hashrate, user_id=user_id, coin=coin)
+        
+        # 1. Get account balance (ESSENTIAL)
+        logger.debug("Collecting balance for %s...", account_name)
+        balance_data, error_msg = self._call_endpoint(account_id, '/api/account.htm',
+                                                      client.get_account_balance, user_id=user_id, coin=coin)
+        
+        if error_msg is None:
+            self._buffer_row('account_balances',
+                             self.db.account_balance_row(account_id, balance_data, coin, bucket))
+            partial['data_collected'].append((account_name, 'balance'))
+        else:
+            partial['errors'].append(f'{account_name}: Balance error - {error_msg}')
+        
+        partial['api_calls_made'] += 1
+        
+        # 2. Get hashrate data (ESSENTIAL)
+        if hashrate_future is not None:
+            hashrate_data, error_msg = hashrate_future.result()
+            
+            if error_msg is None:
+                self._buffer_row('hashrates', self.db.hashrate_row(account_id, coin, hashrate_data, bucket))
+                partial['data_collected'].append((account_name, 'hashrate'))
+                
+                # Check for offline workers
+                active_workers = hashrate_data.get('activeWorkers', 0)
+                total_workers = hashrate_data.get('totalWorkers', 0)
+                if active_workers == 0 and total_workers > 0:
+                    partial['offline_devices'].append({
+                        'account': account_name,
+                        'total_workers': total_workers,
+                        'active_workers': 0
+                    })
+            else:
+                partial['errors'].append(f'{account_name}: Hashrate error - {error_msg}')
+            
+            partial['api_calls_made'] += 1
+        
+        partial['sub_accounts_processed'] += 1
+        
+        return partial
+    
     def collect_tier1_data(self, coin: str = 'BTC') -> Dict[str, Any]:
         """
         Tier 1: Essential Dashboard Data (Every 10 minutes)
@@ -171,6 +470,10 @@ class DataExtractionOrchestrator:
         - API Usage: ~66 calls (33 balance + 33 hashrate)
         - Focus: Financial data and basic performance
         """
+        return asyncio.run(self.collect_tier1_data_async(coin))
+    
+    async def collect_tier1_data_async(self, coin: str = 'BTC') -> Dict[str, Any]:
+        """Tier 1 collection with accounts processed concurrently"""
         results = {
             'success': True,
             'data_collected': [],
@@ -182,86 +485,32 @@ class DataExtractionOrchestrator:
         
         try:
             logger.info("=== Tier 1 Collection Started ===")
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             # Get all account names
             account_names = get_all_account_names()
             logger.info(f"Processing {len(account_names)} sub-accounts for Tier 1...")
+            self._prefetch_accounts(account_names)
             
-            for account_name in account_names:
-                if not self._check_rate_limit():
-                    break
-                    
-                try:
-                    # Get credentials for this specific account
-                    api_key, api_secret, user_id = get_account_credentials(account_name)
-                    
-                    # Create client with this account's credentials
-                    client = AntpoolClient(api_key=api_key, api_secret=api_secret, user_id=user_id)
-                    
-                    # Create/get account in database
-                    account_id = self._get_or_create_account(account_name, 'sub')
-                    
-                    # 1. Get account balance (ESSENTIAL)
-                    logger.debug(f"Collecting balance for {account_name}...")
-                    call_start = time.time()
-                    balance_data = client.get_account_balance(user_id=user_id, coin=coin)
-                    call_time = int((time.time() - call_start) * 1000)
-                    
-                    if balance_data and balance_data.get('code') == 0:
-                        self.db.insert_account_balance(account_id, balance_data['data'], coin)
-                        results['data_collected'].append(f'{account_name}_balance')
-                        self._log_api_call('/api/account.htm', account_id, 200, call_time)
-                    else:
-                        error_msg = balance_data.get('message', 'Unknown error') if balance_data else 'No response'
-                        self._log_api_call('/api/account.htm', account_id, 400, call_time, error_msg)
-                        results['errors'].append(f'{account_name}: Balance error - {error_msg}')
-                    
-                    results['api_calls_made'] += 1
-                    
-                    # 2. Get hashrate data (ESSENTIAL)
-                    if self._check_rate_limit():
-                        logger.debug(f"Collecting hashrate for {account_name}...")
-                        call_start = time.time()
-                        hashrate_data = client.get_hashrate(user_id=user_id, coin=coin)
-                        call_time = int((time.time() - call_start) * 1000)
-                        
-                        if hashrate_data and hashrate_data.get('code') == 0:
-                            self.db.insert_hashrate(account_id, coin, hashrate_data['data'])
-                            results['data_collected'].append(f'{account_name}_hashrate')
-                            self._log_api_call('/api/hashrate.htm', account_id, 200, call_time)
-                            
-                            # Check for offline workers
-                            data = hashrate_data['data']
-                            if data.get('activeWorkers', 0) == 0 and data.get('totalWorkers', 0) > 0:
-                                results['offline_devices'].append({
-                                    'account': account_name,
-                                    'total_workers': data.get('totalWorkers', 0),
-                                    'active_workers': 0
-                                })
-                        else:
-                            error_msg = hashrate_data.get('message', 'Unknown error') if hashrate_data else 'No response'
-                            self._log_api_call('/api/hashrate.htm', account_id, 400, call_time, error_msg)
-                            results['errors'].append(f'{account_name}: Hashrate error - {error_msg}')
-                        
-                        results['api_calls_made'] += 1
-                    
-                    results['sub_accounts_processed'] += 1
-                    
-                    # Small delay to avoid overwhelming API
-                    time.sleep(0.1)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process {account_name}: {e}")
-                    results['errors'].append(f'{account_name}: {str(e)}')
-            
-            execution_time = time.time() - start_time
-            logger.info(f"=== Tier 1 Collection Complete ===")
-            logger.info(f"Processed: {results['sub_accounts_processed']} accounts")
-            logger.info(f"API calls: {results['api_calls_made']}")
-            logger.info(f"Data collected: {len(results['data_collected'])} datasets")
-            logger.info(f"Offline devices: {len(results['offline_devices'])}")
-            logger.info(f"Execution time: {execution_time:.2f}s")
+            # Every row of this run shares one snapshot bucket, so a re-run
+            # inside the same window overwrites rather than duplicates
+            bucket = int(time.time() // AntpoolConfig.TIER1_BUCKET_SECONDS)
+            
+            for partial in await self._collect_accounts_concurrently(
+                    'tier1', AntpoolConfig.TIER1_MAX_WORKERS, account_names,
+                    self._collect_tier1_account, coin, bucket):
+                self._merge_partial(results, partial)
+            
+            # Balances and hashrates are buffered per account; write them in bulk
+            await asyncio.to_thread(self.flush)
+            
+            execution_time = time.perf_counter() - start_time
+            self._log_tier_summary('Tier 1',
+                                   accounts_processed=results['sub_accounts_processed'],
+                                   api_calls=results['api_calls_made'],
+                                   datasets=len(results['data_collected']),
+                                   offline_devices=len(results['offline_devices']),
+                                   execution_time=execution_time)
             
             if results['errors']:
                 logger.warning(f"Errors encountered: {len(results['errors'])}")
@@ -274,7 +523,135 @@ class DataExtractionOrchestrator:
         
         return results
     
-    def collect_tier2_data(self, coin: str = 'BTC') -> Dict[str, Any]:
+    def _merge_partial(self, results: Dict[str, Any], partial: Dict[str, Any]):
+        """Fold one account's partial results into the tier totals"""
+        for key, value in partial.items():
+            if isinstance(value, list):
+                results[key].extend(value)
+            else:
+                results[key] += value
+    
+    async def _collect_accounts_concurrently(self, tier: str, max_workers: int, account_names,
+                                             collect_account, *args) -> List[Dict[str, Any]]:
+        """
+        Run collect_account(name, *args) for every account on a bounded thread pool
+        
+        A semaphore with one slot per executor thread (and no more than the
+        Antpool connection pool) admits an account only when a thread is free
+        to run it, so the rate limit is checked as each account starts. A failing
+        account is recorded as an error partial without disturbing the others;
+        a SupabaseAuthError cancels the remaining accounts and is re-raised.
+        Returns the partial results of the accounts that ran.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(min(max_workers, AntpoolConfig.POOL_MAXSIZE))
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=tier) as executor:
+            
+            async def _collect(account_name: str) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    if not self._check_rate_limit():
+                        logger.warning("Rate limit reached, skipping %s in %s", account_name, tier)
+                        return None
+                    try:
+                        return await loop.run_in_executor(executor, collect_account, account_name, *args)
+                    except SupabaseAuthError:
+                        # Bad credentials fail every account the same way; stop the group
+                        raise
+                    except Exception as e:
+                        logger.error("Failed to process %s in %s: %s", account_name, tier, e)
+                        return {'errors': [f'{account_name}: {str(e)}']}
+            
+            try:
+                async with asyncio.TaskGroup() as group:
+                    tasks = [group.create_task(_collect(name)) for name in account_names]
+            except ExceptionGroup as errors:
+                # Only SupabaseAuthError escapes _collect; surface it as the tier's error
+                raise errors.exceptions[0]
+        
+        return [partial for partial in (task.result() for task in tasks) if partial is not None]
+    
+    def _collect_tier2_account(self, account_name: str, coin: str, as_of: datetime) -> Dict[str, Any]:
+        """Fetch, parse and store all workers for one account; returns its partial results"""
+        partial = {
+            'data_collected': [],
+            'errors': [],
+            'api_calls_made': 0,
+            'sub_accounts_processed': 0,
+            'total_workers_found': 0,
+            'workers_processed': 0,
+            'total_workers_stored': 0
+        }
+        
+        client, user_id = self._client_for(account_name)
+        account_id = self._get_or_create_account(account_name, 'sub')
+        
+        # Get ALL workers from ALL pages
+        logger.debug("Collecting ALL workers for %s...", account_name)
+        call_start = time.perf_counter_ns()
+        
+        all_workers_data = client.get_all_workers(user_id=user_id, coin=coin, worker_status=0)
+        call_time = (time.perf_counter_ns() - call_start) // 1_000_000
+        
+        if all_workers_data.get('workers') and not all_workers_data.get('complete', True):
+            # A partial list would understate the account's workers; record the failure instead
+            api_calls = all_workers_data.get('api_calls_made', 0)
+            error_msg = (f"Incomplete worker list: {all_workers_data['total_workers']}/"
+                         f"{all_workers_data.get('total_records_expected', 0)} workers, "
+                         f"{all_workers_data.get('pages_failed', 0)} pages failed")
+            partial['api_calls_made'] += api_calls
+            self._log_api_call('/api/userWorkerList.htm', account_id, 400, call_time, error_msg, calls=api_calls)
+            partial['errors'].append(f'{account_name}: {error_msg}')
+            logger.warning("❌ %s: %s", account_name, error_msg)
+            
+        elif all_workers_data and all_workers_data.get('workers'):
+            # Parse and store all individual workers
+            worker_summary = self._parse_and_store_workers(account_id, account_name, all_workers_data, as_of)
+            api_calls = all_workers_data.get('api_calls_made', 0)
+            pages_fetched = all_workers_data.get('total_pages_fetched', 0)
+            
+            # Store account overview summary
+            overview_data = {
+                'total_workers': worker_summary['total_workers'],
+                'active_workers': worker_summary['active_workers'],
+                'inactive_workers': worker_summary['inactive_workers'],
+                'invalid_workers': worker_summary['invalid_workers'],
+                'user_id': user_id,
+                'worker_summary': {
+                    'pages_fetched': pages_fetched,
+                    'api_calls_made': api_calls,
+                    'last_updated': as_of.isoformat(),
+                    'data_source': 'complete_pagination'
+                }
+            }
+            self._buffer_row('account_overview', self.db.account_overview_row(account_id, overview_data))
+            
+            # Update results
+            partial['data_collected'].append((account_name, 'complete_workers'))
+            partial['total_workers_found'] += worker_summary['total_workers']
+            partial['workers_processed'] += worker_summary['workers_processed']
+            partial['total_workers_stored'] += worker_summary['workers_stored']
+            partial['api_calls_made'] += api_calls
+            
+            # One log entry for the whole paginated fetch
+            self._log_api_call('/api/userWorkerList.htm', account_id, 200, call_time, calls=api_calls)
+            
+            logger.info("✅ %s: %s workers (%s active) from %s pages", account_name, worker_summary['total_workers'],
+                        worker_summary['active_workers'], pages_fetched)
+            
+        else:
+            error_msg = 'No worker data returned from get_all_workers'
+            api_calls = all_workers_data.get('api_calls_made', 1) if all_workers_data else 1
+            partial['api_calls_made'] += api_calls
+            self._log_api_call('/api/userWorkerList.htm', account_id, 400, call_time, error_msg, calls=api_calls)
+            partial['errors'].append(f'{account_name}: {error_msg}')
+            logger.warning("❌ %s: %s", account_name, error_msg)
+        
+        partial['sub_accounts_processed'] += 1
+        
+        return partial
+    
+    def collect_tier2_data(self, coin: str = 'BTC', as_of: Optional[datetime] = None) -> Dict[str, Any]:
         """
         Tier 2: Complete Worker Data Collection (Every 30 minutes)
         - Get ALL workers from ALL pages for each account
@@ -283,6 +660,18 @@ class DataExtractionOrchestrator:
         - API Usage: Variable (depends on worker count - BlackDawn ~27 calls for 1344 workers)
         - Focus: Complete worker inventory and performance data
         """
+        return asyncio.run(self.collect_tier2_data_async(coin, as_of))
+    
+    async def collect_tier2_data_async(self, coin: str = 'BTC',
+                                       as_of: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Tier 2 collection with accounts processed concurrently
+        
+        Accounts run on a dedicated thread pool of TIER2_MAX_WORKERS threads
+        and are admitted one free thread at a time, never more than the
+        Antpool connection pool, so the fan-out cannot thrash the shared session.
+        Every row written is stamped with as_of (default: now, read once).
+        """
         results = {
             'success': True,
             'data_collected': [],
@@ -290,89 +679,35 @@ class DataExtractionOrchestrator:
             'api_calls_made': 0,
             'sub_accounts_processed': 0,
             'total_workers_found': 0,
+            'workers_processed': 0,
             'total_workers_stored': 0
         }
         
         try:
             logger.info("=== Tier 2 Collection Started ===")
-            start_time = time.time()
+            start_time = time.perf_counter()
+            as_of = as_of or datetime.now(timezone.utc)
             
             account_names = get_all_account_names()
             logger.info(f"Processing {len(account_names)} sub-accounts for Tier 2...")
+            self._prefetch_accounts(account_names)
             
-            for account_name in account_names:
-                if not self._check_rate_limit():
-                    logger.warning(f"Rate limit reached, stopping Tier 2 collection")
-                    break
-                    
-                try:
-                    api_key, api_secret, user_id = get_account_credentials(account_name)
-                    client = AntpoolClient(api_key=api_key, api_secret=api_secret, user_id=user_id)
-                    account_id = self._get_or_create_account(account_name, 'sub')
-                    
-                    # Get ALL workers from ALL pages
-                    logger.info(f"🔄 Collecting ALL workers for {account_name}...")
-                    call_start = time.time()
-                    
-                    all_workers_data = client.get_all_workers(user_id=user_id, coin=coin, worker_status=0)
-                    call_time = int((time.time() - call_start) * 1000)
-                    
-                    if all_workers_data and all_workers_data.get('workers'):
-                        # Parse and store all individual workers
-                        worker_summary = self._parse_and_store_workers(account_id, account_name, all_workers_data)
-                        
-                        # Store account overview summary
-                        overview_data = {
-                            'total_workers': worker_summary['total_workers'],
-                            'active_workers': worker_summary['active_workers'],
-                            'inactive_workers': worker_summary['inactive_workers'],
-                            'invalid_workers': worker_summary['invalid_workers'],
-                            'user_id': user_id,
-                            'worker_summary': {
-                                'pages_fetched': worker_summary['pages_fetched'],
-                                'api_calls_made': worker_summary['api_calls_made'],
-                                'last_updated': datetime.now().isoformat(),
-                                'data_source': 'complete_pagination'
-                            }
-                        }
-                        
-                        self.db.insert_account_overview(account_id, coin, overview_data)
-                        
-                        # Update results
-                        results['data_collected'].append(f'{account_name}_complete_workers')
-                        results['total_workers_found'] += worker_summary['total_workers']
-                        results['total_workers_stored'] += worker_summary['workers_stored']
-                        results['api_calls_made'] += worker_summary['api_calls_made']
-                        
-                        # Log API calls
-                        for i in range(worker_summary['api_calls_made']):
-                            self._log_api_call('/api/userWorkerList.htm', account_id, 200, call_time // worker_summary['api_calls_made'])
-                        
-                        logger.info(f"✅ {account_name}: {worker_summary['total_workers']} workers ({worker_summary['active_workers']} active) from {worker_summary['pages_fetched']} pages")
-                        
-                    else:
-                        error_msg = 'No worker data returned from get_all_workers'
-                        self._log_api_call('/api/userWorkerList.htm', account_id, 400, call_time, error_msg)
-                        results['errors'].append(f'{account_name}: {error_msg}')
-                        logger.warning(f"❌ {account_name}: {error_msg}")
-                    
-                    results['sub_accounts_processed'] += 1
-                    
-                    # Small delay between accounts
-                    time.sleep(1.0)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process {account_name} in Tier 2: {e}")
-                    results['errors'].append(f'{account_name}: {str(e)}')
-            
-            execution_time = time.time() - start_time
-            logger.info(f"=== Tier 2 Collection Complete ===")
-            logger.info(f"Processed: {results['sub_accounts_processed']} accounts")
-            logger.info(f"API calls: {results['api_calls_made']}")
-            logger.info(f"Workers found: {results['total_workers_found']}")
-            logger.info(f"Workers stored: {results['total_workers_stored']}")
-            logger.info(f"Data collected: {len(results['data_collected'])} datasets")
-            logger.info(f"Execution time: {execution_time:.2f}s")
+            for partial in await self._collect_accounts_concurrently(
+                    'tier2', AntpoolConfig.TIER2_MAX_WORKERS, account_names,
+                    self._collect_tier2_account, coin, as_of):
+                self._merge_partial(results, partial)
+            
+            # Write out the tail of the worker buffer before reporting totals
+            await asyncio.to_thread(self.flush)
+            
+            execution_time = time.perf_counter() - start_time
+            self._log_tier_summary('Tier 2',
+                                   accounts_processed=results['sub_accounts_processed'],
+                                   api_calls=results['api_calls_made'],
+                                   workers_found=results['total_workers_found'],
+                                   workers_stored=results['total_workers_stored'],
+                                   datasets=len(results['data_collected']),
+                                   execution_time=execution_time)
             
             if results['errors']:
                 results['success'] = len(results['errors']) < len(account_names) * 0.5
@@ -394,6 +729,43 @@ class DataExtractionOrchestrator:
         
         return results
     
+    def _collect_tier3_account(self, account_name: str, coin: str) -> Dict[str, Any]:
+        """Fetch and store the detailed worker list for one account; returns its partial results"""
+        partial = {
+            'data_collected': [],
+            'errors': [],
+            'api_calls_made': 0,
+            'sub_accounts_processed': 0,
+            'workers_analyzed': 0
+        }
+        
+        client, user_id = self._client_for(account_name)
+        account_id = self._get_or_create_account(account_name, 'sub')
+        
+        # Get worker list with status
+        logger.debug("Collecting worker list for %s...", account_name)
+        worker_data, error_msg = self._call_endpoint(account_id, '/api/userWorkerList.htm',
+                                                     client.get_worker_list, user_id=user_id, coin=coin,
+                                                     worker_status=0, page_size=50)  # All workers
+        
+        if error_msg is None:
+            workers = worker_data.get('result', {}).get('rows', [])
+            # Detailed snapshots are not bucketed; a NULL bucket never conflicts in the upsert
+            created_at = datetime.now(timezone.utc).isoformat()
+            for worker in workers:
+                self._buffer_row('workers', self.db.worker_data_row(account_id, worker, created_at))
+                partial['workers_analyzed'] += 1
+            
+            partial['data_collected'].append((account_name, 'workers'))
+            logger.info("Analyzed %s workers for %s", len(workers), account_name)
+        else:
+            partial['errors'].append(f'{account_name}: Worker list error - {error_msg}')
+        
+        partial['api_calls_made'] += 1
+        partial['sub_accounts_processed'] += 1
+        
+        return partial
+    
     def collect_tier3_data(self, coin: str = 'BTC') -> Dict[str, Any]:
         """
         Tier 3: Detailed Worker Data (Every 2 hours)
@@ -401,6 +773,10 @@ class DataExtractionOrchestrator:
         - API Usage: ~50-100 calls (selective based on Tier 1/2 findings)
         - Focus: Detailed worker analysis for problematic accounts
         """
+        return asyncio.run(self.collect_tier3_data_async(coin))
+    
+    async def collect_tier3_data_async(self, coin: str = 'BTC') -> Dict[str, Any]:
+        """Tier 3 collection with problem accounts processed concurrently"""
         results = {
             'success': True,
             'data_collected': [],
@@ -412,57 +788,27 @@ class DataExtractionOrchestrator:
         
         try:
             logger.info("=== Tier 3 Collection Started ===")
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             # Get accounts that need detailed analysis (offline workers, low hashrate, etc.)
             problem_accounts = self._identify_problem_accounts()
             logger.info(f"Analyzing {len(problem_accounts)} accounts with potential issues...")
+            self._prefetch_accounts(problem_accounts)
             
-            for account_name in problem_accounts:
-                if not self._check_rate_limit():
-                    break
-                    
-                try:
-                    api_key, api_secret, user_id = get_account_credentials(account_name)
-                    client = AntpoolClient(api_key=api_key, api_secret=api_secret, user_id=user_id)
-                    account_id = self._get_or_create_account(account_name, 'sub')
-                    
-                    # Get worker list with status
-                    logger.debug(f"Collecting worker list for {account_name}...")
-                    call_start = time.time()
-                    worker_data = client.get_worker_list(user_id=user_id, coin_type=coin, 
-                                                       worker_status=0, page_size=50)  # All workers
-                    call_time = int((time.time() - call_start) * 1000)
-                    
-                    if worker_data and worker_data.get('code') == 0:
-                        workers = worker_data['data']['result']['rows']
-                        for worker in workers:
-                            self.db.insert_worker_data(account_id, coin, worker, 'detailed')
-                            results['workers_analyzed'] += 1
-                        
-                        results['data_collected'].append(f'{account_name}_workers')
-                        self._log_api_call('/api/userWorkerList.htm', account_id, 200, call_time)
-                        logger.info(f"Analyzed {len(workers)} workers for {account_name}")
-                    else:
-                        error_msg = worker_data.get('message', 'Unknown error') if worker_data else 'No response'
-                        self._log_api_call('/api/userWorkerList.htm', account_id, 400, call_time, error_msg)
-                        results['errors'].append(f'{account_name}: Worker list error - {error_msg}')
-                    
-                    results['api_calls_made'] += 1
-                    results['sub_accounts_processed'] += 1
-                    
-                    time.sleep(0.2)  # Longer delay for detailed analysis
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process {account_name} in Tier 3: {e}")
-                    results['errors'].append(f'{account_name}: {str(e)}')
-            
-            execution_time = time.time() - start_time
-            logger.info(f"=== Tier 3 Collection Complete ===")
-            logger.info(f"Processed: {results['sub_accounts_processed']} accounts")
-            logger.info(f"Workers analyzed: {results['workers_analyzed']}")
-            logger.info(f"API calls: {results['api_calls_made']}")
-            logger.info(f"Execution time: {execution_time:.2f}s")
+            for partial in await self._collect_accounts_concurrently(
+                    'tier3', AntpoolConfig.TIER3_MAX_WORKERS, problem_accounts,
+                    self._collect_tier3_account, coin):
+                self._merge_partial(results, partial)
+            
+            # Worker rows are buffered per account; write them in bulk
+            await asyncio.to_thread(self.flush)
+            
+            execution_time = time.perf_counter() - start_time
+            self._log_tier_summary('Tier 3',
+                                   accounts_processed=results['sub_accounts_processed'],
+                                   workers_analyzed=results['workers_analyzed'],
+                                   api_calls=results['api_calls_made'],
+                                   execution_time=execution_time)
             
             if results['errors']:
                 results['success'] = len(results['errors']) < len(problem_accounts) * 0.5
@@ -474,6 +820,59 @@ class DataExtractionOrchestrator:
         
         return results
     
+    def _collect_tier4_account(self, account_name: str, coin: str) -> Dict[str, Any]:
+        """Fetch and store payout and earnings history for one account; returns its partial results"""
+        partial = {
+            'data_collected': [],
+            'errors': [],
+            'api_calls_made': 0,
+            'sub_accounts_processed': 0,
+            'payments_collected': 0
+        }
+        
+        client, user_id = self._client_for(account_name)
+        account_id = self._get_or_create_account(account_name, 'sub')
+        
+        # Get payout history
+        logger.debug("Collecting payout history for %s...", account_name)
+        payout_data, error_msg = self._call_endpoint(account_id, '/api/paymentHistoryV2.htm',
+                                                     client.get_payment_history, coin=coin,
+                                                     payment_type='payout', page_size=20)
+        
+        if error_msg is None:
+            payouts = payout_data.get('rows', [])
+            for payout in payouts:
+                self._buffer_row('payment_history',
+                                 self.db.payment_history_row(account_id, coin, payout, 'payout'))
+                partial['payments_collected'] += 1
+            
+            partial['data_collected'].append((account_name, 'payouts'))
+        else:
+            partial['errors'].append(f'{account_name}: Payout history error - {error_msg}')
+        
+        partial['api_calls_made'] += 1
+        
+        # Get earnings history (if API calls remaining)
+        if self._check_rate_limit():
+            earnings_data, error_msg = self._call_endpoint(account_id, '/api/paymentHistoryV2.htm',
+                                                           client.get_payment_history, coin=coin,
+                                                           payment_type='recv', page_size=10)
+            
+            if error_msg is None:
+                earnings = earnings_data.get('rows', [])
+                for earning in earnings:
+                    self._buffer_row('payment_history',
+                                     self.db.payment_history_row(account_id, coin, earning, 'earnings'))
+                    partial['payments_collected'] += 1
+                
+                partial['data_collected'].append((account_name, 'earnings'))
+            
+            partial['api_calls_made'] += 1
+        
+        partial['sub_accounts_processed'] += 1
+        
+        return partial
+    
     def collect_tier4_data(self, coin: str = 'BTC') -> Dict[str, Any]:
         """
         Tier 4: Payment History & Cleanup (Daily)
@@ -482,6 +881,10 @@ class DataExtractionOrchestrator:
         - API Usage: ~100-200 calls (33 payment history + cleanup operations)
         - Focus: Financial records and database maintenance
         """
+        return asyncio.run(self.collect_tier4_data_async(coin))
+    
+    async def collect_tier4_data_async(self, coin: str = 'BTC') -> Dict[str, Any]:
+        """Tier 4 collection with accounts processed concurrently, then database cleanup"""
         results = {
             'success': True,
             'data_collected': [],
@@ -489,87 +892,44 @@ class DataExtractionOrchestrator:
             'api_calls_made': 0,
             'sub_accounts_processed': 0,
             'payments_collected': 0,
-            'cleanup_results': {}
+            'cleanup_results': {},
+            'records_deleted': 0
         }
         
         try:
             logger.info("=== Tier 4 Collection Started ===")
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             account_names = get_all_account_names()
             logger.info(f"Processing payment history for {len(account_names)} accounts...")
+            self._prefetch_accounts(account_names)
             
             # Collect payment history
-            for account_name in account_names:
-                if not self._check_rate_limit():
-                    break
-                    
-                try:
-                    api_key, api_secret, user_id = get_account_credentials(account_name)
-                    client = AntpoolClient(api_key=api_key, api_secret=api_secret, user_id=user_id)
-                    account_id = self._get_or_create_account(account_name, 'sub')
-                    
-                    # Get payout history
-                    logger.debug(f"Collecting payout history for {account_name}...")
-                    call_start = time.time()
-                    payout_data = client.get_payment_history(coin=coin, payment_type='payout', page_size=20)
-                    call_time = int((time.time() - call_start) * 1000)
-                    
-                    if payout_data and payout_data.get('code') == 0:
-                        payouts = payout_data['data']['rows']
-                        for payout in payouts:
-                            self.db.insert_payment_history(account_id, coin, payout, 'payout')
-                            results['payments_collected'] += 1
-                        
-                        results['data_collected'].append(f'{account_name}_payouts')
-                        self._log_api_call('/api/paymentHistoryV2.htm', account_id, 200, call_time)
-                    else:
-                        error_msg = payout_data.get('message', 'Unknown error') if payout_data else 'No response'
-                        self._log_api_call('/api/paymentHistoryV2.htm', account_id, 400, call_time, error_msg)
-                        results['errors'].append(f'{account_name}: Payout history error - {error_msg}')
-                    
-                    results['api_calls_made'] += 1
-                    
-                    # Get earnings history (if API calls remaining)
-                    if self._check_rate_limit():
-                        call_start = time.time()
-                        earnings_data = client.get_payment_history(coin=coin, payment_type='recv', page_size=10)
-                        call_time = int((time.time() - call_start) * 1000)
-                        
-                        if earnings_data and earnings_data.get('code') == 0:
-                            earnings = earnings_data['data']['rows']
-                            for earning in earnings:
-                                self.db.insert_payment_history(account_id, coin, earning, 'earnings')
-                                results['payments_collected'] += 1
-                            
-                            results['data_collected'].append(f'{account_name}_earnings')
-                            self._log_api_call('/api/paymentHistoryV2.htm', account_id, 200, call_time)
-                        
-                        results['api_calls_made'] += 1
-                    
-                    results['sub_accounts_processed'] += 1
-                    time.sleep(0.2)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process {account_name} in Tier 4: {e}")
-                    results['errors'].append(f'{account_name}: {str(e)}')
+            for partial in await self._collect_accounts_concurrently(
+                    'tier4', AntpoolConfig.TIER4_MAX_WORKERS, account_names,
+                    self._collect_tier4_account, coin):
+                self._merge_partial(results, partial)
+            
+            # Payment rows are buffered per account; write them before cleanup runs
+            await asyncio.to_thread(self.flush)
             
             # Perform database cleanup
             logger.info("Performing database cleanup...")
             try:
-                cleanup_results = self._perform_database_cleanup()
+                cleanup_results = await self._perform_database_cleanup_async()
                 results['cleanup_results'] = cleanup_results
+                results['records_deleted'] = sum(v for v in cleanup_results.values() if isinstance(v, int))
                 logger.info(f"Cleanup completed: {cleanup_results}")
             except Exception as e:
                 logger.error(f"Database cleanup failed: {e}")
                 results['errors'].append(f"Cleanup error: {str(e)}")
             
-            execution_time = time.time() - start_time
-            logger.info(f"=== Tier 4 Collection Complete ===")
-            logger.info(f"Processed: {results['sub_accounts_processed']} accounts")
-            logger.info(f"Payments collected: {results['payments_collected']}")
-            logger.info(f"API calls: {results['api_calls_made']}")
-            logger.info(f"Execution time: {execution_time:.2f}s")
+            execution_time = time.perf_counter() - start_time
+            self._log_tier_summary('Tier 4',
+                                   accounts_processed=results['sub_accounts_processed'],
+                                   payments_collected=results['payments_collected'],
+                                   api_calls=results['api_calls_made'],
+                                   execution_time=execution_time)
             
             if results['errors']:
                 results['success'] = len(results['errors']) < len(account_names) * 0.5
@@ -583,31 +943,39 @@ class DataExtractionOrchestrator:
     
     def _identify_problem_accounts(self) -> List[str]:
         """Identify accounts that need detailed analysis based on recent data"""
+        now = time.monotonic()
+        if self._problem_cache and now - self._problem_cache[0] < self.PROBLEM_ACCOUNTS_TTL:
+            return self._problem_cache[1]
+        
         try:
             # Get accounts with offline workers or low hashrate from recent data
-            problem_accounts = self.db.get_problem_accounts()
-            return problem_accounts[:15]  # Limit to 15 accounts to stay under API limit
+            problem_accounts = self.db.get_problem_accounts()[:15]  # Limit to 15 accounts to stay under API limit
+            self._problem_cache = (now, problem_accounts)
+            return problem_accounts
         except Exception as e:
             logger.error(f"Failed to identify problem accounts: {e}")
             # Fallback: return first 10 accounts
             return get_all_account_names()[:10]
     
-    def _perform_database_cleanup(self) -> Dict[str, int]:
-        """Perform database cleanup operations"""
+    async def _perform_database_cleanup_async(self) -> Dict[str, int]:
+        """Run the retention DELETEs in one RPC, or concurrently per table if that is unavailable"""
         cleanup_results = {}
+        try:
+            cleanup_results.update(await asyncio.to_thread(self.db.run_maintenance_cleanup))
+            logger.info(f"Database cleanup completed: {cleanup_results}")
+            return cleanup_results
+        except Exception as e:
+            logger.warning(f"maintenance_cleanup RPC failed, cleaning tables individually: {e}")
+        
+        cleanups = {
+            'deleted_workers': self.db.cleanup_old_worker_data,    # Old worker data
+            'deleted_api_logs': self.db.cleanup_old_api_logs,      # Old API logs
+            'deleted_alerts': self.db.cleanup_old_alerts           # Resolved alerts
+        }
         
         try:
-            # Cleanup old worker data
-            deleted_workers = self.db.cleanup_old_worker_data()
-            cleanup_results['deleted_workers'] = deleted_workers
-            
-            # Cleanup old API logs
-            deleted_logs = self.db.cleanup_old_api_logs()
-            cleanup_results['deleted_api_logs'] = deleted_logs
-            
-            # Cleanup resolved alerts
-            deleted_alerts = self.db.cleanup_old_alerts()
-            cleanup_results['deleted_alerts'] = deleted_alerts
+            counts = await asyncio.gather(*(asyncio.to_thread(cleanup) for cleanup in cleanups.values()))
+            cleanup_results.update(zip(cleanups, counts))
             
             logger.info(f"Database cleanup completed: {cleanup_results}")
             
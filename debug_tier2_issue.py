@@ -28,6 +28,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# hsLast10min values that mean the worker is offline
+ZERO_HASHRATES = frozenset({'0 TH/s', '0.00 TH/s', '0', ''})
+
 def test_worker_list_call():
     """Test the exact worker list call used in Tier 2"""
     try:
@@ -61,12 +64,14 @@ def test_worker_list_call():
                         logger.info(f"Data keys: {list(data.keys()) if isinstance(data, dict) else 'Data not a dict'}")
                         
                         # Test the overview data extraction
+                        result = data.get('result') or {}
+                        rows = result.get('rows') or []
                         overview_data = {
-                            'total_workers': data.get('result', {}).get('totalRecord', 0),
-                            'active_workers': len([w for w in data.get('result', {}).get('rows', []) if w.get('hsLast10min', '0') != '0 TH/s']),
+                            'total_workers': result.get('totalRecord', 0),
+                            'active_workers': sum(1 for w in rows if w.get('hsLast10min', '0') not in ZERO_HASHRATES),
                             'coin_type': data.get('coinType', 'BTC'),
                             'user_id': data.get('userId', user_id),
-                            'worker_summary': data.get('result', {})
+                            'worker_summary': result
                         }
                         logger.info(f"Extracted overview data: {overview_data}")
                         
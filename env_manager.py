@@ -6,6 +6,7 @@ Handles encrypted .env files to avoid GitHub secrets limits
 
 import os
 import base64
+import functools
 import json
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
@@ -14,6 +15,22 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Parsed .env contents keyed by (absolute path, mtime) so reloading an
+# unchanged file in the same process skips the read and decrypt
+_LOADED_ENV = {}
+
+@functools.lru_cache(maxsize=4)
+def _derive_key(password: str) -> bytes:
+    """Derive the Fernet key for a password (PBKDF2 is deliberately slow, so memoize it)"""
+    salt = b'pow_crm_salt_2025'  # Fixed salt for consistency
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+
 class EncryptedEnvManager:
     """Manages encrypted environment variables"""
     
@@ -27,16 +44,7 @@ class EncryptedEnvManager:
     
     def _create_fernet(self, password: str) -> Fernet:
         """Create Fernet encryption object from password"""
-        password_bytes = password.encode()
-        salt = b'pow_crm_salt_2025'  # Fixed salt for consistency
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password_bytes))
-        return Fernet(key)
+        return Fernet(_derive_key(password))
     
     def encrypt_env_file(self, env_file_path: str, output_path: str = None) -> str:
         """Encrypt a .env file"""
@@ -89,6 +97,13 @@ class EncryptedEnvManager:
         if not os.path.exists(encrypted_file_path):
             raise FileNotFoundError(f"Encrypted file not found: {encrypted_file_path}")
         
+        cache_key = (os.path.abspath(encrypted_file_path), os.path.getmtime(encrypted_file_path))
+        cached = _LOADED_ENV.get(cache_key)
+        if cached is not None:
+            os.environ.update(cached)
+            logger.debug(f"Reused {len(cached)} cached environment variables")
+            return dict(cached)
+        
         # Read and decrypt
         with open(encrypted_file_path, 'r') as f:
             encoded_content = f.read()
@@ -106,6 +121,7 @@ class EncryptedEnvManager:
                 # Also set in os.environ
                 os.environ[key.strip()] = value.strip()
         
+        _LOADED_ENV[cache_key] = dict(env_vars)
         logger.info(f"Loaded {len(env_vars)} environment variables")
         return env_vars
     
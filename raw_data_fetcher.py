@@ -6,11 +6,12 @@ Fetches raw API responses and stores them as strings for later parsing
 
 import os
 import sys
-import json
 import logging
 import time
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+import orjson
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -37,6 +38,7 @@ class RawDataFetcher:
     def __init__(self, supabase_url: str, supabase_key: str):
         """Initialize raw data fetcher"""
         self.raw_manager = RawDataManager(supabase_url, supabase_key)
+        self._clients: Dict[str, Tuple[AntpoolClient, str]] = {}  # Account name -> (client, user_id)
         self.api_calls_made = 0
         self.api_call_limit = 580  # Leave buffer under 600 limit
         logger.info("Raw Data Fetcher initialized")
@@ -48,6 +50,15 @@ class RawDataFetcher:
             return False
         return True
     
+    def _client_for(self, account_name: str) -> Tuple[AntpoolClient, str]:
+        """Return the account's cached API client together with its user id"""
+        cached = self._clients.get(account_name)
+        if cached is None:
+            api_key, api_secret, user_id = get_account_credentials(account_name)
+            client = AntpoolClient(api_key=api_key, api_secret=api_secret, user_id=user_id)
+            cached = self._clients[account_name] = (client, user_id)
+        return cached
+    
     def _get_account_id(self, account_name: str) -> int:
         """Get or create account ID (simplified for demo)"""
         # In production, this would use the actual account management system
@@ -66,35 +77,35 @@ class RawDataFetcher:
             ID of stored raw response or None if failed
         """
         try:
-            # Get credentials
-            api_key, api_secret, user_id = get_account_credentials(account_name)
-            client = AntpoolClient(api_key=api_key, api_secret=api_secret, user_id=user_id)
+            # Client bound to this account's credentials (reused across fetches)
+            client, user_id = self._client_for(account_name)
             account_id = self._get_account_id(account_name)
             
             logger.info(f"🔄 Fetching raw worker data for {account_name}...")
             
             # Record start time
-            start_time = time.time()
+            start_time = time.perf_counter_ns()
             
             # Make API call and capture raw response
             all_workers = client.get_all_workers(user_id=user_id, coin=coin)
             
             # Calculate duration
-            duration_ms = int((time.time() - start_time) * 1000)
+            duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
             self.api_calls_made += 1
             
             # Convert response to JSON string
             if all_workers is not None:
-                raw_response_str = json.dumps(all_workers, default=str, ensure_ascii=False)
-                response_size = len(raw_response_str.encode('utf-8'))
-                worker_count = len(all_workers) if isinstance(all_workers, list) else 0
+                raw_response_bytes = orjson.dumps(all_workers, default=str)
+                raw_response_str = raw_response_bytes.decode('utf-8')
+                response_size = len(raw_response_bytes)
+                worker_count = all_workers.get('total_workers', 0)
                 
                 logger.info(f"📊 {account_name}: Fetched {worker_count} workers, "
                            f"{response_size} bytes, {duration_ms}ms")
             else:
                 # Store empty response for debugging
-                raw_response_str = json.dumps(None)
-                response_size = len(raw_response_str.encode('utf-8'))
+                raw_response_str = 'null'
+                response_size = len(raw_response_str)
                 worker_count = 0
                 
                 logger.warning(f"⚠️ {account_name}: No data returned from API")
@@ -150,7 +161,7 @@ class RawDataFetcher:
         
         try:
             logger.info("=== RAW DATA FETCHING STARTED ===")
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             account_names = get_all_account_names()
             if max_accounts:
@@ -193,7 +204,7 @@ class RawDataFetcher:
                     results['errors'].append(f'{account_name}: {str(e)}')
             
             results['total_api_calls'] = self.api_calls_made
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             
             logger.info("=== RAW DATA FETCHING COMPLETE ===")
             logger.info(f"📊 SUMMARY:")
@@ -232,26 +243,26 @@ class RawDataFetcher:
             ID of stored raw response or None if failed
         """
         try:
-            # Get credentials
-            api_key, api_secret, user_id = get_account_credentials(account_name)
-            client = AntpoolClient(api_key=api_key, api_secret=api_secret, user_id=user_id)
+            # Client bound to this account's credentials (reused across fetches)
+            client, user_id = self._client_for(account_name)
             account_id = self._get_account_id(account_name)
             
             logger.info(f"🔄 Fetching raw overview data for {account_name}...")
             
             # Record start time
-            start_time = time.time()
+            start_time = time.perf_counter_ns()
             
             # Make API call
             overview_data = client.get_account_overview(user_id=user_id, coin=coin)
             
             # Calculate duration
-            duration_ms = int((time.time() - start_time) * 1000)
+            duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
             self.api_calls_made += 1
             
             # Convert response to JSON string
-            raw_response_str = json.dumps(overview_data, default=str, ensure_ascii=False)
-            response_size = len(raw_response_str.encode('utf-8'))
+            raw_response_bytes = orjson.dumps(overview_data, default=str)
+            raw_response_str = raw_response_bytes.decode('utf-8')
+            response_size = len(raw_response_bytes)
             
             # Create raw response object
             raw_response = RawApiResponse(
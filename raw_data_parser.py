@@ -6,12 +6,13 @@ Parses stored raw API responses and populates Supabase tables
 
 import os
 import sys
-import json
 import logging
 import time
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, Tuple
 
+import orjson
+
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -128,7 +129,7 @@ class RawDataParser:
         
         try:
             # Parse the raw JSON response
-            raw_response = json.loads(raw_record['raw_response'])
+            raw_response = orjson.loads(raw_record['raw_response'])
             account_name = raw_record['account_name']
             
             logger.info(f"🔄 Parsing workers for {account_name}...")
@@ -194,7 +195,7 @@ class RawDataParser:
                     'active_workers': active_workers,
                     'inactive_workers': inactive_workers,
                     'invalid_workers': invalid_workers,
-                    'user_id': raw_record.get('request_params', {}).get('user_id', ''),
+                    'user_id': (raw_record.get('request_params') or {}).get('user_id', ''),
                     'worker_summary': f"Total: {len(workers_data)}, Active: {active_workers}, Inactive: {inactive_workers}",
                     'data_source': 'raw_parsed'
                 }
@@ -205,7 +206,7 @@ class RawDataParser:
                 error_message = f"No valid workers found in response (invalid: {invalid_workers})"
                 logger.warning(f"⚠️ {account_name}: {error_message}")
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             error_message = f"JSON decode error: {str(e)}"
             logger.error(f"❌ {account_name}: {error_message}")
         except Exception as e:
@@ -229,7 +230,7 @@ class RawDataParser:
         
         try:
             # Parse the raw JSON response
-            raw_response = json.loads(raw_record['raw_response'])
+            raw_response = orjson.loads(raw_record['raw_response'])
             account_name = raw_record['account_name']
             
             logger.info(f"🔄 Parsing overview for {account_name}...")
@@ -247,7 +248,7 @@ class RawDataParser:
                 error_message = f"Invalid overview response: {raw_response.get('message', 'Unknown error')}"
                 logger.warning(f"⚠️ {account_name}: {error_message}")
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             error_message = f"JSON decode error: {str(e)}"
             logger.error(f"❌ {account_name}: {error_message}")
         except Exception as e:
@@ -277,7 +278,7 @@ class RawDataParser:
         
         try:
             logger.info("=== RAW DATA PROCESSING STARTED ===")
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             # Get unprocessed records
             unprocessed_records = self.raw_manager.get_unprocessed_responses(limit=batch_size)
@@ -330,7 +331,7 @@ class RawDataParser:
                     if 'id' in record:
                         self.raw_manager.mark_as_processed(record['id'], 0, str(e))
             
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             
             logger.info("=== RAW DATA PROCESSING COMPLETE ===")
             logger.info(f"📊 SUMMARY:")
@@ -7,9 +7,10 @@ This ensures we never lose data even if parsing fails
 import os
 import sys
 import logging
-import json
 from datetime import datetime, timezone
 
+import orjson
+
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -101,7 +102,7 @@ class RawDataManager:
             for record in raw_records.data:
                 try:
                     # Parse JSON string
-                    workers_data = json.loads(record['raw_workers_json'])
+                    workers_data = orjson.loads(record['raw_workers_json'])
                     
                     # Process each worker
                     for worker in workers_data:
@@ -227,8 +228,8 @@ def collect_and_store_raw_data():
             
             if all_workers:
                 # Convert to JSON string
-                raw_json = json.dumps(all_workers, default=str)
-                worker_count = len(all_workers)
+                raw_json = orjson.dumps(all_workers, default=str).decode('utf-8')
+                worker_count = all_workers['total_workers']
                 
                 # Store raw data
                 if raw_manager.store_raw_worker_data(account_id, account_name, raw_json, worker_count):
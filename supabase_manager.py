@@ -6,9 +6,15 @@ Handles all database operations with performance optimizations:
 - Optimized queries
 """
 
+import csv
+import io
 import logging
+import os
+import threading
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone, timedelta
+
+import orjson
 from supabase import create_client, Client
 
 # Reduce Supabase client logging
@@ -17,12 +23,80 @@ logging.getLogger('httpx').setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+# PostgREST/Postgres error codes for bad or under-privileged credentials
+_AUTH_ERROR_CODES = frozenset({'PGRST301', 'PGRST302', '42501'})
+
+def _parse_th_hashrate(value) -> int:
+    """Parse hashrate value like '123.45 TH/s' to integer"""
+    if isinstance(value, str):
+        value_str = value.strip().removesuffix('TH/s').rstrip()
+        if value_str and value_str != '0':
+            return int(float(value_str))
+    return 0
+
+def _parse_reject_rate(value) -> float:
+    """Parse reject rate like '0.01%' to float"""
+    if isinstance(value, str):
+        value_str = value.strip().removesuffix('%').rstrip()
+        if value_str:
+            return float(value_str)
+    return 0.0
+
+def _parse_epoch_seconds(value) -> Optional[str]:
+    """Parse timestamp to ISO format"""
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromtimestamp(int(value), tz=timezone.utc).isoformat()
+        except (ValueError, TypeError):
+            pass
+    return None
+
+def _copy_value(value):
+    """Encode dict/list values as JSON text for a COPY CSV field"""
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
+
+class SupabaseAuthError(Exception):
+    """Supabase rejected the configured credentials; retrying per account is pointless"""
+    pass
+
+class BulkWriteError(Exception):
+    """Some rows of a bulk write could not be stored; written counts the rows that were"""
+    def __init__(self, message: str, written: int):
+        super().__init__(message)
+        self.written = written
+
 class SupabaseManager:
+    # Rows per request for bulk writes
+    BULK_CHUNK_SIZE = 500
+    
+    # Tables written by upsert rather than insert, with their conflict target
+    UPSERT_CONFLICT_KEYS = {
+        'account_balances': 'account_id,coin_type,timestamp_bucket',
+        'hashrates': 'account_id,coin_type,timestamp_bucket',
+        'workers': 'account_id,worker_name,timestamp_bucket'
+    }
+    
     def __init__(self, supabase_url: str, supabase_key: str):
         """Initialize Supabase client"""
         self.client: Client = create_client(supabase_url, supabase_key)
+        
+        # Direct Postgres connection for COPY-based bulk loads; opened lazily
+        # and only when SUPABASE_CONNECTION_STRING is configured
+        self._copy_dsn = os.getenv('SUPABASE_CONNECTION_STRING')
+        self._copy_conn = None
+        self._copy_lock = threading.Lock()
         logger.info("Supabase Manager initialized")
     
+    @staticmethod
+    def is_auth_error(error: Exception) -> bool:
+        """Whether an exception from a Supabase call is an auth/permission failure"""
+        if getattr(error, 'code', None) in _AUTH_ERROR_CODES:
+            return True
+        response = getattr(error, 'response', None)
+        return getattr(response, 'status_code', None) in (401, 403)
+    
     def get_account_id(self, account_name: str) -> Optional[int]:
         """Get account ID by name"""
         try:
@@ -34,6 +108,34 @@ class SupabaseManager:
             logger.error(f"Failed to get account ID for {account_name}: {e}")
             return None
     
+    def get_account_ids(self, account_names: List[str]) -> Dict[str, int]:
+        """Get IDs for many accounts in one query; unknown names are omitted"""
+        try:
+            response = self.client.table('accounts').select('id, account_name').in_(
+                'account_name', list(account_names)
+            ).execute()
+            return {row['account_name']: row['id'] for row in response.data or []}
+        except Exception as e:
+            if self.is_auth_error(e):
+                raise SupabaseAuthError(f"Supabase rejected credentials: {e}") from e
+            logger.error(f"Failed to get account IDs: {e}")
+            return {}
+    
+    def upsert_accounts(self, account_names: List[str], account_type: str = 'sub') -> Dict[str, int]:
+        """Create or update many accounts in one request and return their IDs"""
+        try:
+            data = [{
+                'account_name': account_name,
+                'account_type': account_type,
+                'is_active': True
+            } for account_name in account_names]
+            
+            response = self.client.table('accounts').upsert(data, on_conflict='account_name').execute()
+            return {row['account_name']: row['id'] for row in response.data or []}
+        except Exception as e:
+            logger.error(f"Failed to upsert {len(account_names)} accounts: {e}")
+            raise
+    
     def upsert_account(self, account_name: str, account_type: str = 'sub') -> int:
         """Create or update account and return ID"""
         try:
@@ -50,17 +152,45 @@ class SupabaseManager:
             logger.error(f"Failed to upsert account {account_name}: {e}")
             raise
     
+    @staticmethod
+    def account_balance_row(account_id: int, balance_data: Dict[str, Any], coin_type: str,
+                            timestamp_bucket: Optional[int] = None) -> Dict[str, Any]:
+        """Map an account balance response to an account_balances row"""
+        row = {
+            'account_id': account_id,
+            'coin_type': coin_type,
+            'total_amount': float(balance_data.get('totalAmount', 0)),
+            'unpaid_amount': float(balance_data.get('unpaidAmount', 0)),
+            'yesterday_amount': float(balance_data.get('yesterdayAmount', 0)),
+            'settle_time': balance_data.get('settleTime', '')
+        }
+        if timestamp_bucket is not None:
+            row['timestamp_bucket'] = timestamp_bucket
+        return row
+    
+    @staticmethod
+    def hashrate_row(account_id: int, coin_type: str, hashrate_data: Dict[str, Any],
+                     timestamp_bucket: Optional[int] = None) -> Dict[str, Any]:
+        """Map a hashrate response to a hashrates row"""
+        row = {
+            'account_id': account_id,
+            'coin_type': coin_type,
+            'hashrate_10m': int(hashrate_data.get('hashrate10m', 0)),
+            'hashrate_1h': int(hashrate_data.get('hashrate1h', 0)),
+            'hashrate_1d': int(hashrate_data.get('hashrate1d', 0)),
+            'total_workers': int(hashrate_data.get('totalWorkers', 0)),
+            'active_workers': int(hashrate_data.get('activeWorkers', 0)),
+            'inactive_workers': int(hashrate_data.get('inactiveWorkers', 0)),
+            'invalid_workers': int(hashrate_data.get('invalidWorkers', 0))
+        }
+        if timestamp_bucket is not None:
+            row['timestamp_bucket'] = timestamp_bucket
+        return row
+    
     def insert_account_balance(self, account_id: int, balance_data: Dict[str, Any], coin_type: str):
         """Insert account balance data"""
         try:
-            data = {
-                'account_id': account_id,
-                'coin_type': coin_type,
-                'total_amount': float(balance_data.get('totalAmount', 0)),
-                'unpaid_amount': float(balance_data.get('unpaidAmount', 0)),
-                'yesterday_amount': float(balance_data.get('yesterdayAmount', 0)),
-                'settle_time': balance_data.get('settleTime', '')
-            }
+            data = self.account_balance_row(account_id, balance_data, coin_type)
             
             response = self.client.table('account_balances').insert(data).execute()
             return response.data[0]['id'] if response.data else None
@@ -71,17 +201,7 @@ class SupabaseManager:
     def insert_hashrate(self, account_id: int, coin_type: str, hashrate_data: Dict[str, Any]):
         """Insert hashrate data"""
         try:
-            data = {
-                'account_id': account_id,
-                'coin_type': coin_type,
-                'hashrate_10m': int(hashrate_data.get('hashrate10m', 0)),
-                'hashrate_1h': int(hashrate_data.get('hashrate1h', 0)),
-                'hashrate_1d': int(hashrate_data.get('hashrate1d', 0)),
-                'total_workers': int(hashrate_data.get('totalWorkers', 0)),
-                'active_workers': int(hashrate_data.get('activeWorkers', 0)),
-                'inactive_workers': int(hashrate_data.get('inactiveWorkers', 0)),
-                'invalid_workers': int(hashrate_data.get('invalidWorkers', 0))
-            }
+            data = self.hashrate_row(account_id, coin_type, hashrate_data)
             
             response = self.client.table('hashrates').insert(data).execute()
             return response.data[0]['id'] if response.data else None
@@ -89,18 +209,23 @@ class SupabaseManager:
             logger.error(f"Failed to insert hashrate: {e}")
             raise
     
+    @staticmethod
+    def account_overview_row(account_id: int, overview_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a worker-list summary to an account_overview row"""
+        return {
+            'account_id': account_id,
+            'total_workers': overview_data.get('total_workers', 0),
+            'active_workers': overview_data.get('active_workers', 0),
+            'inactive_workers': overview_data.get('inactive_workers', 0),
+            'invalid_workers': overview_data.get('invalid_workers', 0),
+            'user_id': overview_data.get('user_id', ''),
+            'worker_summary': overview_data.get('worker_summary', '')
+        }
+    
     def insert_account_overview(self, account_id: int, coin_type: str, overview_data: Dict[str, Any]):
         """Insert account overview data"""
         try:
-            data = {
-                'account_id': account_id,
-                'total_workers': overview_data.get('total_workers', 0),
-                'active_workers': overview_data.get('active_workers', 0),
-                'inactive_workers': overview_data.get('inactive_workers', 0),
-                'invalid_workers': overview_data.get('invalid_workers', 0),
-                'user_id': overview_data.get('user_id', ''),
-                'worker_summary': overview_data.get('worker_summary', '')
-            }
+            data = self.account_overview_row(account_id, overview_data)
             
             response = self.client.table('account_overview').insert(data).execute()
             return response.data[0]['id'] if response.data else None
@@ -138,6 +263,153 @@ class SupabaseManager:
             # Fallback to individual inserts if batch fails
             return self._fallback_individual_inserts(workers_data)
     
+    def bulk_insert(self, table: str, rows: List[Dict[str, Any]]) -> int:
+        """
+        Bulk insert rows; returns rows written
+        
+        Streams through COPY when a direct Postgres connection is configured,
+        otherwise (or if COPY fails) inserts BULK_CHUNK_SIZE chunks via the
+        REST API without echoing them back. Raises BulkWriteError once every
+        chunk has been tried if any of them failed.
+        """
+        inserted_count = 0
+        failed_count = 0
+        created_at = datetime.now(timezone.utc).isoformat()
+        for row in rows:
+            row.setdefault('created_at', created_at)
+        
+        if self._copy_dsn and rows:
+            try:
+                return self._copy_rows(table, rows)
+            except Exception as e:
+                logger.warning(f"COPY into {table} failed, falling back to REST inserts: {e}")
+        
+        for i in range(0, len(rows), self.BULK_CHUNK_SIZE):
+            chunk = rows[i:i + self.BULK_CHUNK_SIZE]
+            
+            try:
+                self._post_rows(table, chunk, 'return=minimal')
+                inserted_count += len(chunk)
+            except Exception as e:
+                if self.is_auth_error(e):
+                    raise SupabaseAuthError(f"Supabase rejected credentials: {e}") from e
+                logger.error(f"Failed to bulk insert {len(chunk)} rows into {table}: {e}")
+                failed_count += len(chunk)
+        
+        if failed_count:
+            raise BulkWriteError(f"{failed_count} of {len(rows)} rows not inserted into {table}", inserted_count)
+        return inserted_count
+    
+    def bulk_upsert(self, table: str, rows: List[Dict[str, Any]], on_conflict: str) -> int:
+        """
+        Bulk upsert rows on the on_conflict columns; returns rows written
+        
+        Rows sharing a conflict key are collapsed to the last one, since a
+        single upsert statement cannot touch the same row twice. Rows with a
+        NULL key column never conflict and are all kept. Uses COPY into a
+        staging table when a direct Postgres connection is configured. Raises
+        BulkWriteError once every chunk has been tried if any of them failed.
+        """
+        upserted_count = 0
+        failed_count = 0
+        created_at = datetime.now(timezone.utc).isoformat()
+        key_columns = on_conflict.split(',')
+        unique_rows = {}
+        unkeyed_rows = []
+        for row in rows:
+            row.setdefault('created_at', created_at)
+            key = tuple(row.get(column) for column in key_columns)
+            if None in key:
+                unkeyed_rows.append(row)
+            else:
+                unique_rows[key] = row
+        rows = [*unique_rows.values(), *unkeyed_rows]
+        
+        if self._copy_dsn and rows:
+            try:
+                return self._copy_rows(table, rows, on_conflict)
+            except Exception as e:
+                logger.warning(f"COPY upsert into {table} failed, falling back to REST upserts: {e}")
+        
+        for i in range(0, len(rows), self.BULK_CHUNK_SIZE):
+            chunk = rows[i:i + self.BULK_CHUNK_SIZE]
+            
+            try:
+                self._post_rows(table, chunk, 'resolution=merge-duplicates,return=minimal',
+                                on_conflict=on_conflict)
+                upserted_count += len(chunk)
+            except Exception as e:
+                if self.is_auth_error(e):
+                    raise SupabaseAuthError(f"Supabase rejected credentials: {e}") from e
+                logger.error(f"Failed to bulk upsert {len(chunk)} rows into {table}: {e}")
+                failed_count += len(chunk)
+        
+        if failed_count:
+            raise BulkWriteError(f"{failed_count} of {len(rows)} rows not upserted into {table}", upserted_count)
+        return upserted_count
+    
+    def _post_rows(self, table: str, rows: List[Dict[str, Any]], prefer: str, **params):
+        """POST rows to a PostgREST table with an orjson-encoded body"""
+        # postgrest-py encodes bodies with stdlib json; send pre-encoded bytes
+        # over its authenticated session instead. orjson writes datetime
+        # values as RFC 3339 itself, so rows may carry them unconverted
+        response = self.client.postgrest.session.post(
+            f'/{table}', content=orjson.dumps(rows, option=orjson.OPT_NAIVE_UTC), params=params,
+            headers={'Content-Type': 'application/json', 'Prefer': prefer}
+        )
+        response.raise_for_status()
+    
+    def _copy_rows(self, table: str, rows: List[Dict[str, Any]], on_conflict: Optional[str] = None) -> int:
+        """
+        Stream rows into a table with COPY FROM STDIN (CSV) in one transaction
+        
+        With on_conflict, rows are copied into a temporary staging table and
+        merged with INSERT ... ON CONFLICT DO UPDATE.
+        """
+        columns = list(rows[0])
+        column_list = ', '.join(columns)
+        
+        buffer = io.StringIO()
+        # JSON columns (e.g. worker_summary) go through COPY as JSON text, not a Python repr
+        csv.writer(buffer).writerows([_copy_value(row.get(column)) for column in columns] for row in rows)
+        buffer.seek(0)
+        
+        with self._copy_lock:
+            if self._copy_conn is None or self._copy_conn.closed:
+                # Imported here: only COPY needs it, and most runs use REST only
+                import psycopg2
+                self._copy_conn = psycopg2.connect(self._copy_dsn)
+            
+            try:
+                with self._copy_conn.cursor() as cursor:
+                    if on_conflict is None:
+                        cursor.copy_expert(f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+                    else:
+                        key_columns = on_conflict.split(',')
+                        updates = ', '.join(f"{column} = EXCLUDED.{column}"
+                                            for column in columns if column not in key_columns)
+                        cursor.execute(f"CREATE TEMP TABLE staging_{table} "
+                                       f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+                        cursor.copy_expert(f"COPY staging_{table} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+                                           buffer)
+                        cursor.execute(f"INSERT INTO {table} ({column_list}) "
+                                       f"SELECT {column_list} FROM staging_{table} "
+                                       f"ON CONFLICT ({on_conflict}) DO UPDATE SET {updates}")
+                self._copy_conn.commit()
+            except Exception:
+                if not self._copy_conn.closed:
+                    self._copy_conn.rollback()
+                raise
+        
+        return len(rows)
+    
+    def close(self):
+        """Close the direct Postgres connection used for COPY, if open"""
+        with self._copy_lock:
+            if self._copy_conn is not None and not self._copy_conn.closed:
+                self._copy_conn.close()
+            self._copy_conn = None
+    
     def _fallback_individual_inserts(self, workers_data: List[Dict[str, Any]]) -> int:
         """Fallback to individual inserts if batch insert fails"""
         inserted_count = 0
@@ -154,12 +426,7 @@ class SupabaseManager:
     def insert_worker_data(self, account_id: int, coin_type: str, worker_data: Dict[str, Any], data_type: str = 'tier2_complete'):
         """Insert individual worker data (used for Tier 3/4)"""
         try:
-            # Parse worker data to match schema
-            parsed_data = self._parse_worker_for_db(worker_data)
-            parsed_data.update({
-                'account_id': account_id,
-                'created_at': datetime.now(timezone.utc).isoformat()
-            })
+            parsed_data = self.worker_data_row(account_id, worker_data, datetime.now(timezone.utc).isoformat())
             
             response = self.client.table('workers').insert(parsed_data).execute()
             return response.data[0]['id'] if response.data else None
@@ -167,55 +434,51 @@ class SupabaseManager:
             logger.error(f"Failed to insert worker data: {e}")
             raise
     
+    def worker_data_row(self, account_id: int, worker_data: Dict[str, Any], created_at: str,
+                        timestamp_bucket: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Map a worker-list record to a workers row
+        
+        created_at and timestamp_bucket are always present (the bucket may be
+        None) so these rows share one key set with Tier 2's bucketed rows in a
+        bulk write.
+        """
+        # Parse worker data to match schema
+        row = self._parse_worker_for_db(worker_data)
+        row['account_id'] = account_id
+        row['created_at'] = created_at
+        row['timestamp_bucket'] = timestamp_bucket
+        return row
+    
     def _parse_worker_for_db(self, worker: Dict[str, Any]) -> Dict[str, Any]:
         """Parse worker data from API response to database format"""
-        def parse_hashrate(value):
-            """Parse hashrate value like '123.45 TH/s' to integer"""
-            if isinstance(value, str):
-                value_str = value.replace(' TH/s', '').replace('TH/s', '').strip()
-                if value_str and value_str != '0':
-                    return int(float(value_str))
-            return 0
-        
-        def parse_reject_rate(value):
-            """Parse reject rate like '0.01%' to float"""
-            if isinstance(value, str):
-                value_str = value.replace('%', '').strip()
-                if value_str:
-                    return float(value_str)
-            return 0.0
-        
-        def parse_timestamp(value):
-            """Parse timestamp to ISO format"""
-            if isinstance(value, str) and value:
-                try:
-                    dt = datetime.fromtimestamp(int(value), tz=timezone.utc)
-                    return dt.isoformat()
-                except (ValueError, TypeError):
-                    pass
-            return None
-        
         return {
             'worker_name': worker.get('workerName', ''),
             'worker_status': 'online' if worker.get('workerStatus') == 1 else 'offline',
-            'hashrate_1h': parse_hashrate(worker.get('hashrate1h', '0')),
-            'hashrate_24h': parse_hashrate(worker.get('hashrate1d', '0')),
-            'reject_rate': parse_reject_rate(worker.get('rejectRate', '0%')),
-            'last_share_time': parse_timestamp(worker.get('lastShareTime'))
+            'hashrate_1h': _parse_th_hashrate(worker.get('hashrate1h', '0')),
+            'hashrate_24h': _parse_th_hashrate(worker.get('hashrate1d', '0')),
+            'reject_rate': _parse_reject_rate(worker.get('rejectRate', '0%')),
+            'last_share_time': _parse_epoch_seconds(worker.get('lastShareTime'))
+        }
+    
+    @staticmethod
+    def payment_history_row(account_id: int, coin_type: str, payment_data: Dict[str, Any],
+                            payment_type: str) -> Dict[str, Any]:
+        """Map a payment history record to a payment_history row"""
+        return {
+            'account_id': account_id,
+            'coin_type': coin_type,
+            'payment_type': payment_type,
+            'amount': float(payment_data.get('amount', 0)),
+            'payment_time': payment_data.get('paymentTime', ''),
+            'transaction_id': payment_data.get('transactionId', ''),
+            'status': payment_data.get('status', 'completed')
         }
     
     def insert_payment_history(self, account_id: int, coin_type: str, payment_data: Dict[str, Any], payment_type: str):
         """Insert payment history data"""
         try:
-            data = {
-                'account_id': account_id,
-                'coin_type': coin_type,
-                'payment_type': payment_type,
-                'amount': float(payment_data.get('amount', 0)),
-                'payment_time': payment_data.get('paymentTime', ''),
-                'transaction_id': payment_data.get('transactionId', ''),
-                'status': payment_data.get('status', 'completed')
-            }
+            data = self.payment_history_row(account_id, coin_type, payment_data, payment_type)
             
             response = self.client.table('payment_history').insert(data).execute()
             return response.data[0]['id'] if response.data else None
@@ -243,21 +506,25 @@ class SupabaseManager:
             logger.error(f"Failed to insert pool stats: {e}")
             raise
     
+    @staticmethod
+    def api_call_log_row(endpoint: str, account_id: Optional[int] = None, status: int = 200,
+                         response_time: int = 0, error: str = None, calls: int = 1) -> Dict[str, Any]:
+        """Build an api_call_logs row (every column present, so rows batch together)"""
+        return {
+            'endpoint': endpoint,
+            'response_status': status,
+            'response_time_ms': response_time,
+            'api_calls_in_window': 1,
+            'pages': calls,
+            'account_id': account_id or None,
+            'error_message': error or None
+        }
+    
     def log_api_call(self, endpoint: str, account_id: Optional[int] = None, 
                     status: int = 200, response_time: int = 0, error: str = None):
         """Log API call for rate limiting (simplified)"""
         try:
-            data = {
-                'endpoint': endpoint,
-                'response_status': status,
-                'response_time_ms': response_time,
-                'api_calls_in_window': 1
-            }
-            
-            if account_id:
-                data['account_id'] = account_id
-            if error:
-                data['error_message'] = error
+            data = self.api_call_log_row(endpoint, account_id, status, response_time, error)
             
             # Silent insert - don't log the logging
             response = self.client.table('api_call_logs').insert(data).execute()
@@ -287,18 +554,25 @@ class SupabaseManager:
     def get_problem_accounts(self) -> List[str]:
         """Get accounts that need detailed analysis"""
         try:
-            # Get accounts with offline workers from recent overview data
-            query = """
-            SELECT DISTINCT a.account_name 
-            FROM accounts a
-            JOIN account_overview ao ON a.id = ao.account_id
-            WHERE ao.created_at > NOW() - INTERVAL '2 hours'
-            AND (ao.inactive_workers > 0 OR ao.invalid_workers > 0)
-            ORDER BY a.account_name
-            LIMIT 15
-            """
+            # Stored function from the schema: filtered and capped in SQL
+            try:
+                response = self.client.rpc('identify_problem_accounts', {'max_accounts': 15}).execute()
+            except Exception as e:
+                logger.warning(f"identify_problem_accounts unavailable, using ad-hoc query: {e}")
+                
+                # Get accounts with offline workers from recent overview data
+                query = """
+                SELECT DISTINCT a.account_name 
+                FROM accounts a
+                JOIN account_overview ao ON a.id = ao.account_id
+                WHERE ao.created_at > NOW() - INTERVAL '2 hours'
+                AND (ao.inactive_workers > 0 OR ao.invalid_workers > 0)
+                ORDER BY a.account_name
+                LIMIT 15
+                """
+                
+                response = self.client.rpc('execute_sql', {'query': query}).execute()
             
-            response = self.client.rpc('execute_sql', {'query': query}).execute()
             if response.data:
                 return [row['account_name'] for row in response.data]
             
@@ -310,14 +584,22 @@ class SupabaseManager:
             logger.error(f"Failed to get problem accounts: {e}")
             return []
     
+    def run_maintenance_cleanup(self) -> Dict[str, int]:
+        """Run every retention DELETE in one transaction via the maintenance_cleanup function"""
+        response = self.client.rpc('maintenance_cleanup', {}).execute()
+        counts = response.data[0] if response.data else {}
+        return {key: counts.get(key) or 0 for key in ('deleted_workers', 'deleted_api_logs', 'deleted_alerts')}
+    
     def cleanup_old_worker_data(self) -> int:
         """Cleanup old detailed worker data (keep 7 days)"""
         try:
             cutoff_date = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
             
-            response = self.client.table('workers').delete().lt('created_at', cutoff_date).execute()
+            response = self.client.table('workers').delete(count='exact', returning='minimal').lt(
+                'created_at', cutoff_date
+            ).execute()
             
-            deleted_count = len(response.data) if response.data else 0
+            deleted_count = response.count or 0
             if deleted_count > 0:
                 logger.info(f"Cleaned up {deleted_count} old worker records")
             return deleted_count
@@ -330,9 +612,11 @@ class SupabaseManager:
         try:
             cutoff_date = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
             
-            response = self.client.table('api_call_logs').delete().lt('created_at', cutoff_date).execute()
+            response = self.client.table('api_call_logs').delete(count='exact', returning='minimal').lt(
+                'created_at', cutoff_date
+            ).execute()
             
-            deleted_count = len(response.data) if response.data else 0
+            deleted_count = response.count or 0
             if deleted_count > 0:
                 logger.info(f"Cleaned up {deleted_count} old API log records")
             return deleted_count
@@ -345,11 +629,11 @@ class SupabaseManager:
         try:
             cutoff_date = (datetime.now(timezone.utc) - timedelta(days=3)).isoformat()
             
-            response = self.client.table('worker_alerts').delete().lt(
+            response = self.client.table('worker_alerts').delete(count='exact', returning='minimal').lt(
                 'created_at', cutoff_date
             ).eq('is_resolved', True).execute()
             
-            deleted_count = len(response.data) if response.data else 0
+            deleted_count = response.count or 0
             if deleted_count > 0:
                 logger.info(f"Cleaned up {deleted_count} old resolved alerts")
             return deleted_count
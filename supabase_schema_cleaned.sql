@@ -46,6 +46,10 @@ CREATE INDEX IF NOT EXISTS idx_account_balances_account_id ON account_balances(a
 CREATE INDEX IF NOT EXISTS idx_account_balances_created_at ON account_balances(created_at);
 CREATE INDEX IF NOT EXISTS idx_account_balances_coin ON account_balances(coin_type);
 
+-- Tier 1 snapshot window (epoch seconds // 600); upserts conflict on this key
+ALTER TABLE account_balances ADD COLUMN IF NOT EXISTS timestamp_bucket BIGINT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_account_balances_bucket ON account_balances(account_id, coin_type, timestamp_bucket);
+
 -- =====================================================
 -- HASHRATES - From /api/hashrate.htm
 -- =====================================================
@@ -70,6 +74,10 @@ CREATE INDEX IF NOT EXISTS idx_hashrates_account_id ON hashrates(account_id);
 CREATE INDEX IF NOT EXISTS idx_hashrates_created_at ON hashrates(created_at);
 CREATE INDEX IF NOT EXISTS idx_hashrates_coin ON hashrates(coin_type);
 
+-- Tier 1 snapshot window (epoch seconds // 600); upserts conflict on this key
+ALTER TABLE hashrates ADD COLUMN IF NOT EXISTS timestamp_bucket BIGINT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_hashrates_bucket ON hashrates(account_id, coin_type, timestamp_bucket);
+
 -- =====================================================
 -- ACCOUNT OVERVIEW - From /api/accountOverview.htm
 -- =====================================================
@@ -124,6 +132,10 @@ CREATE INDEX IF NOT EXISTS idx_workers_status ON workers(worker_status);
 CREATE INDEX IF NOT EXISTS idx_workers_created_at ON workers(created_at);
 CREATE INDEX IF NOT EXISTS idx_workers_data_type ON workers(data_type);
 
+-- Tier 2 snapshot window (epoch seconds // 3600); upserts conflict on this key
+ALTER TABLE workers ADD COLUMN IF NOT EXISTS timestamp_bucket BIGINT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_workers_bucket ON workers(account_id, worker_name, timestamp_bucket);
+
 -- =====================================================
 -- PAYMENT HISTORY - From /api/paymentHistoryV2.htm
 -- =====================================================
@@ -191,6 +203,9 @@ CREATE INDEX IF NOT EXISTS idx_api_logs_created_at ON api_call_logs(created_at);
 CREATE INDEX IF NOT EXISTS idx_api_logs_endpoint ON api_call_logs(endpoint);
 CREATE INDEX IF NOT EXISTS idx_api_logs_window ON api_call_logs(window_start);
 
+-- Antpool requests one logged call stands for (a paginated fetch is logged once)
+ALTER TABLE api_call_logs ADD COLUMN IF NOT EXISTS pages INTEGER DEFAULT 1;
+
 -- =====================================================
 -- WORKER ALERTS - Simple offline/performance alerts
 -- =====================================================
@@ -340,6 +355,47 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Tier 4 maintenance: every retention DELETE in one transaction and one round-trip
+-- (same retention as the per-table cleanups in SupabaseManager)
+CREATE OR REPLACE FUNCTION maintenance_cleanup()
+RETURNS TABLE (
+    deleted_workers INTEGER,
+    deleted_api_logs INTEGER,
+    deleted_alerts INTEGER
+) AS $$
+BEGIN
+    DELETE FROM workers 
+    WHERE created_at < NOW() - INTERVAL '7 days';
+    GET DIAGNOSTICS deleted_workers = ROW_COUNT;
+    
+    DELETE FROM api_call_logs 
+    WHERE created_at < NOW() - INTERVAL '7 days';
+    GET DIAGNOSTICS deleted_api_logs = ROW_COUNT;
+    
+    DELETE FROM worker_alerts 
+    WHERE is_resolved = TRUE 
+    AND created_at < NOW() - INTERVAL '3 days';
+    GET DIAGNOSTICS deleted_alerts = ROW_COUNT;
+    
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Accounts with inactive or invalid workers in the last 2 hours (Tier 3 targets)
+CREATE OR REPLACE FUNCTION identify_problem_accounts(max_accounts INTEGER DEFAULT 15)
+RETURNS TABLE (account_name VARCHAR) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT DISTINCT a.account_name 
+    FROM accounts a
+    JOIN account_overview ao ON a.id = ao.account_id
+    WHERE ao.created_at > NOW() - INTERVAL '2 hours'
+    AND (ao.inactive_workers > 0 OR ao.invalid_workers > 0)
+    ORDER BY a.account_name
+    LIMIT max_accounts;
+END;
+$$ LANGUAGE plpgsql;
+
 -- =====================================================
 -- TRIGGERS FOR AUTOMATIC TIMESTAMPS
 -- =====================================================